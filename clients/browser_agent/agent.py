@@ -30,7 +30,6 @@ if str(_current_dir) not in sys.path:
 
 # ruff: noqa: E402
 from browser import BrowserController  # type: ignore  # noqa: E402
-from client import WebSocketClient  # type: ignore  # noqa: E402
 from config import Config  # type: ignore  # noqa: E402
 
 
@@ -49,6 +48,7 @@ def setup_logging(verbose: bool = False) -> None:
 
     # 過濾外部套件的 DEBUG 日誌
     logging.getLogger("websockets").setLevel(logging.WARNING)
+    logging.getLogger("picows").setLevel(logging.WARNING)
 
 
 def parse_args() -> argparse.Namespace:
@@ -157,6 +157,9 @@ async def main() -> int:
         logger.error("   啟動參數: chrome --remote-debugging-port=9222 --user-data-dir=/tmp/chrome_debug")
         return 1
 
+    # 延後載入 WebSocket 客戶端（websockets、orjson），讓 --help 等 CLI 操作不需付出匯入成本
+    from client import WebSocketClient  # type: ignore
+
     # 建立 WebSocket 客戶端
     client = WebSocketClient(config, browser)
 
@@ -171,5 +174,17 @@ async def main() -> int:
     return 0
 
 
+def run() -> int:
+    """啟動事件迴圈（POSIX 平台優先使用 uvloop，Windows 使用預設迴圈）"""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.run(main())
+    return asyncio.run(main())
+
+
 if __name__ == "__main__":
-    sys.exit(asyncio.run(main()))
+    sys.exit(run())
@@ -4,12 +4,15 @@
 封裝 Playwright CDP 瀏覽器操作，提供統一的操作接口。
 """
 
-import base64
+import asyncio
+import contextlib
+import itertools
+import json
 import logging
+import urllib.request
+from collections.abc import Iterator
 from typing import Any
 
-from playwright.async_api import async_playwright
-
 logger = logging.getLogger(__name__)
 
 
@@ -20,12 +23,100 @@ class BrowserController:
     透過 Playwright CDP 連接本地 Chrome 瀏覽器，提供操作接口。
     """
 
+    __slots__ = ("_cdp_endpoint", "_playwright", "_browser", "_context", "_page", "_cdp", "_connected", "_handles", "_handle_ids")
+
+    # 單次 evaluate 同時取得 URL 與標題
+    _PAGE_INFO_JS = "() => [location.href, document.title]"
+
+    # 滾動腳本：固定字串讓 V8 可重用已編譯的程式碼，像素數以參數傳入
+    _SCROLL_TOP_JS = "window.scrollTo(0, 0)"
+    _SCROLL_BOTTOM_JS = "window.scrollTo(0, document.body.scrollHeight)"
+    _SCROLL_BY_JS = "(px) => window.scrollBy(0, px)"
+    # 以 CDP Runtime.evaluate 執行，需為表達式而非函式
+    _SCROLL_POS_JS = "({ x: window.scrollX, y: window.scrollY })"
+
+    # 只回傳符合元素的數量，不建立 ElementHandle
+    # 非 CSS selector 或頁面含 open shadow root（document.querySelectorAll 不會進入 shadow DOM）時回傳 -1
+    _COUNT_SELECTOR_JS = """(selector) => {
+        let count;
+        try {
+            count = document.querySelectorAll(selector).length;
+        } catch (e) {
+            return -1;
+        }
+        const walker = document.createTreeWalker(document, NodeFilter.SHOW_ELEMENT);
+        while (walker.nextNode()) {
+            if (walker.currentNode.shadowRoot) {
+                return -1;
+            }
+        }
+        return count;
+    }"""
+
+    # 在頁面內以 MutationObserver 等待元素出現，整個等待只需一次 CDP 往返
+    # 逾時回傳 null；非 CSS selector（如 text=、xpath=）或頁面含 open shadow root 時回傳 false，
+    # 交由 Playwright 處理（document.querySelector 不會進入 shadow DOM，Playwright 的 CSS 引擎會）
+    _WAIT_FOR_SELECTOR_JS = """([selector, timeout]) => new Promise((resolve) => {
+        let found;
+        try {
+            found = document.querySelector(selector);
+        } catch (e) {
+            resolve(false);
+            return;
+        }
+        if (found) {
+            resolve(found);
+            return;
+        }
+        const walker = document.createTreeWalker(document, NodeFilter.SHOW_ELEMENT);
+        while (walker.nextNode()) {
+            if (walker.currentNode.shadowRoot) {
+                resolve(false);
+                return;
+            }
+        }
+        const observer = new MutationObserver(() => {
+            const element = document.querySelector(selector);
+            if (element) {
+                clearTimeout(timer);
+                observer.disconnect();
+                resolve(element);
+            }
+        });
+        const timer = setTimeout(() => {
+            observer.disconnect();
+            resolve(null);
+        }, timeout);
+        observer.observe(document, { childList: true, subtree: true, attributes: true });
+    })"""
+
+    # 可透過 batch 並行呼叫的方法（回傳值需可 JSON 序列化）
+    _BATCH_METHODS = frozenset(
+        {
+            "get_url",
+            "get_title",
+            "get_viewport",
+            "query_selector_all",
+            "inner_text",
+            "evaluate",
+            "element_get_attribute",
+            "element_inner_text",
+            "get_cookies",
+        }
+    )
+
     def __init__(self, cdp_endpoint: str = "http://localhost:9222"):
         self._cdp_endpoint = cdp_endpoint
         self._playwright: Any = None
         self._browser: Any = None
+        self._context: Any = None
         self._page: Any = None
+        # 直接對 Page target 發送 CDP 指令的 session（熱路徑使用）
+        self._cdp: Any = None
         self._connected = False
+        # query_selector_all 快照：token -> ElementHandle 列表
+        self._handles: dict[str, list[Any]] = {}
+        self._handle_ids = itertools.count(1)
 
     @property
     def is_connected(self) -> bool:
@@ -39,17 +130,35 @@ class BrowserController:
         Returns:
             是否連接成功
         """
+        # Playwright 匯入成本高，延後到實際連線時才載入
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError:
+            logger.error("請安裝 playwright: pip install playwright")
+            return False
+
         try:
-            logger.info(f"正在連接到 Chrome CDP: {self._cdp_endpoint}")
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.connect_over_cdp(self._cdp_endpoint)
-            logger.info(f"✅ 已連接到瀏覽器: {self._browser.version}")
+            logger.info("正在連接到 Chrome CDP: %s", self._cdp_endpoint)
+            # 啟動 Playwright driver 與探測 CDP HTTP endpoint 同時進行
+            playwright, endpoint = await asyncio.gather(
+                async_playwright().start(),
+                self._probe_cdp_endpoint(),
+                return_exceptions=True,
+            )
+            if not isinstance(playwright, BaseException):
+                self._playwright = playwright
+            for result in (playwright, endpoint):
+                if isinstance(result, BaseException):
+                    raise result
+
+            self._browser = await self._playwright.chromium.connect_over_cdp(endpoint)
+            logger.info("✅ 已連接到瀏覽器: %s", self._browser.version)
 
             # 取得或建立 Page
             contexts = self._browser.contexts
             if contexts and contexts[0].pages:
                 self._page = contexts[0].pages[0]
-                logger.info(f"使用現有 Page: {self._page.url}")
+                logger.debug("使用現有 Page: %s", self._page.url)
             else:
                 if contexts:
                     self._page = await contexts[0].new_page()
@@ -58,47 +167,121 @@ class BrowserController:
                     self._page = await context.new_page()
                 logger.info("建立新 Page")
 
+            self._context = self._page.context
+            self._cdp = await self._context.new_cdp_session(self._page)
+            # 由事件維護連線狀態，操作方法只需檢查 _connected 旗標
+            self._browser.on("disconnected", self._on_disconnected)
             self._connected = True
             return True
 
         except Exception as e:
-            logger.exception(f"連接 Chrome CDP 失敗: {e}")
+            logger.exception("連接 Chrome CDP 失敗: %s", e)
             await self.disconnect()
             return False
 
+    async def _probe_cdp_endpoint(self) -> str:
+        """
+        探測 CDP HTTP endpoint，回傳可直接連線的 WebSocket 位址
+
+        以短逾時快速回報 Chrome 未啟動的情況，並省去 Playwright 再次查詢 /json/version。
+        非 HTTP endpoint（如 ws://）直接回傳原值。
+        """
+        if not self._cdp_endpoint.startswith(("http://", "https://")):
+            return self._cdp_endpoint
+
+        def fetch() -> str:
+            with urllib.request.urlopen(f"{self._cdp_endpoint.rstrip('/')}/json/version", timeout=5) as response:
+                return json.load(response)["webSocketDebuggerUrl"]
+
+        try:
+            return await asyncio.to_thread(fetch)
+        except (OSError, ValueError, KeyError) as e:
+            raise RuntimeError(f"無法存取 CDP endpoint {self._cdp_endpoint}: {e}") from e
+
     async def disconnect(self) -> None:
         """中斷瀏覽器連接"""
         self._connected = False
+        self._cdp = None
         self._page = None
+        self._context = None
+        self._handles.clear()
         self._browser = None
         if self._playwright:
             await self._playwright.stop()
             self._playwright = None
         logger.info("已中斷瀏覽器連接")
 
-    async def _ensure_page(self) -> Any:
-        """確保有可用的 Page"""
-        if not self.is_connected or self._page is None:
+    def _on_disconnected(self, browser: Any) -> None:
+        """瀏覽器連線中斷事件"""
+        logger.warning("瀏覽器連線已中斷")
+        self._connected = False
+
+    def _ensure_page(self) -> Any:
+        """確保有可用的 Page（_connected 僅在 Page 就緒後設為 True，並由 disconnected 事件清除）"""
+        if not self._connected:
             raise RuntimeError("瀏覽器未連接")
         return self._page
 
+    async def _cdp_eval(self, expression: str) -> Any:
+        """
+        透過 CDP session 直接執行 Runtime.evaluate 並回傳值
+
+        不經 Playwright 的 Page 物件封裝，適用於固定、無參數的熱路徑表達式。
+        """
+        if not self._connected:
+            raise RuntimeError("瀏覽器未連接")
+        response = await self._cdp.send("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+        if "exceptionDetails" in response:
+            raise RuntimeError(f"JavaScript 執行失敗: {response['exceptionDetails'].get('text', '')}")
+        return response["result"].get("value")
+
+    async def _wait_for_selector_fast(self, page: Any, selector: str, timeout: int) -> Any:
+        """
+        等待元素出現並回傳 ElementHandle
+
+        以頁面內的 MutationObserver 取代 Playwright 的輪詢等待；
+        頁面內未找到、無法判斷（非 CSS selector、shadow DOM）或等待中頁面導航時，
+        以剩餘時間改用 page.wait_for_selector，結果與 Playwright 一致。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout / 1000
+
+        try:
+            handle = await page.evaluate_handle(self._WAIT_FOR_SELECTOR_JS, [selector, timeout])
+        except Exception as e:
+            # 等待期間頁面導航會使執行環境失效（Execution context was destroyed），改由 Playwright 繼續等待
+            logger.debug("頁面內等待元素失敗，改用 Playwright 等待: %s", e)
+        else:
+            element = handle.as_element()
+            if element is not None:
+                return element
+            with contextlib.suppress(Exception):
+                await handle.dispose()
+
+        # 頁面內未找到時不代表 Playwright 也找不到（如 shadow DOM），以剩餘時間交由 Playwright 確認
+        # Playwright 的 timeout=0 代表不逾時，因此至少保留 1 毫秒
+        remaining = max(int((deadline - loop.time()) * 1000), 1)
+        element = await page.wait_for_selector(selector, timeout=remaining)
+        if element:
+            return element
+        raise RuntimeError(f"找不到元素: {selector}")
+
     # ═══════════════════════════════════════════════════════════════════════════════
     # 操作方法
     # ═══════════════════════════════════════════════════════════════════════════════
 
     async def get_url(self) -> str:
         """取得當前 URL"""
-        page = await self._ensure_page()
+        page = self._ensure_page()
         return page.url
 
     async def get_title(self) -> str:
         """取得頁面標題"""
-        page = await self._ensure_page()
-        return await page.title()
+        return await self._cdp_eval("document.title")
 
     async def get_viewport(self) -> dict[str, int] | None:
         """取得 viewport 尺寸"""
-        page = await self._ensure_page()
+        page = self._ensure_page()
         return page.viewport_size
 
     async def navigate(self, url: str, wait_until: str = "load", timeout: int = 30000) -> dict[str, Any]:
@@ -113,11 +296,12 @@ class BrowserController:
         Returns:
             導航結果
         """
-        page = await self._ensure_page()
+        page = self._ensure_page()
         await page.goto(url, wait_until=wait_until, timeout=timeout)
+        current_url, title = await page.evaluate(self._PAGE_INFO_JS)
         return {
-            "url": page.url,
-            "title": await page.title(),
+            "url": current_url,
+            "title": title,
         }
 
     async def screenshot(self, full_page: bool = False, selector: str = "") -> dict[str, Any]:
@@ -129,9 +313,9 @@ class BrowserController:
             selector: 截取特定元素（可選）
 
         Returns:
-            包含 base64 編碼的結果
+            包含原始 PNG bytes 的結果（由 WebSocketClient 以二進位 frame 傳送）
         """
-        page = await self._ensure_page()
+        page = self._ensure_page()
 
         if selector:
             element = await page.wait_for_selector(selector, timeout=10000)
@@ -142,7 +326,7 @@ class BrowserController:
             screenshot_bytes = await page.screenshot(full_page=full_page)
 
         return {
-            "base64": base64.b64encode(screenshot_bytes).decode("utf-8"),
+            "bytes": screenshot_bytes,
             "size": len(screenshot_bytes),
         }
 
@@ -158,10 +342,8 @@ class BrowserController:
         Returns:
             點擊結果
         """
-        page = await self._ensure_page()
-        element = await page.wait_for_selector(selector, timeout=timeout)
-        if not element:
-            raise RuntimeError(f"找不到元素: {selector}")
+        page = self._ensure_page()
+        element = await self._wait_for_selector_fast(page, selector, timeout)
         await element.click(click_count=click_count)
         return {"success": True, "current_url": page.url}
 
@@ -186,11 +368,15 @@ class BrowserController:
         Returns:
             輸入結果
         """
-        page = await self._ensure_page()
-        element = await page.wait_for_selector(selector, timeout=timeout)
-        if not element:
-            raise RuntimeError(f"找不到元素: {selector}")
+        page = self._ensure_page()
+        element = await self._wait_for_selector_fast(page, selector, timeout)
 
+        if clear_first and not press_enter:
+            # fill 單次呼叫即完成清空與輸入
+            await element.fill(text)
+            return {"success": True, "current_url": page.url}
+
+        # 需按 Enter 時走逐鍵輸入，保留頁面的鍵盤事件處理
         if clear_first:
             await element.click(click_count=3)
             await element.press("Backspace")
@@ -219,7 +405,7 @@ class BrowserController:
         Returns:
             等待結果
         """
-        page = await self._ensure_page()
+        page = self._ensure_page()
         element = await page.wait_for_selector(selector, timeout=timeout, state=state)
         return {"found": element is not None}
 
@@ -233,22 +419,44 @@ class BrowserController:
         Returns:
             元素數量和索引列表
         """
-        page = await self._ensure_page()
-        elements = await page.query_selector_all(selector)
-        return {"count": len(elements)}
+        page = self._ensure_page()
+        count = await page.evaluate(self._COUNT_SELECTOR_JS, selector)
+        if count < 0:
+            # text=、xpath= 等 Playwright selector 與 shadow DOM 需由 Playwright 解析，確保與 element_* 的索引一致
+            elements = await page.query_selector_all(selector)
+            count = len(elements)
+            await asyncio.gather(*(element.dispose() for element in elements))
+        return {"count": count}
 
     async def inner_text(self, selector: str) -> dict[str, Any]:
         """取得元素內部文字"""
-        page = await self._ensure_page()
+        page = self._ensure_page()
         text = await page.inner_text(selector)
         return {"text": text}
 
     async def get_content(self) -> dict[str, Any]:
         """取得頁面 HTML"""
-        page = await self._ensure_page()
+        page = self._ensure_page()
         html = await page.content()
         return {"html": html}
 
+    async def get_content_stream(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        取得頁面 HTML，並以 UTF-8 分段輸出
+
+        WebSocketClient 會將各段作為同一訊息的 continuation frame 送出，
+        編碼與傳送交錯進行，額外記憶體僅需 O(chunk_size)。
+
+        Args:
+            chunk_size: 每段的字元數
+
+        Returns:
+            UTF-8 bytes 分段迭代器
+        """
+        page = self._ensure_page()
+        html = await page.content()
+        return (html[start : start + chunk_size].encode("utf-8") for start in range(0, len(html), chunk_size))
+
     async def evaluate(self, script: str, arg: Any = None) -> dict[str, Any]:
         """
         執行 JavaScript
@@ -260,7 +468,7 @@ class BrowserController:
         Returns:
             執行結果
         """
-        page = await self._ensure_page()
+        page = self._ensure_page()
         if arg is not None:
             result = await page.evaluate(script, arg)
         else:
@@ -269,18 +477,18 @@ class BrowserController:
 
     async def wait_for_url(self, url_pattern: str, timeout: int = 30000) -> None:
         """等待 URL 符合模式"""
-        page = await self._ensure_page()
+        page = self._ensure_page()
         await page.wait_for_url(url_pattern, timeout=timeout)
 
     async def wait_for_function(self, script: str, timeout: int = 30000) -> None:
         """等待 JavaScript 函數返回 true"""
-        page = await self._ensure_page()
+        page = self._ensure_page()
         await page.wait_for_function(script, timeout=timeout)
 
     async def wait_for_timeout(self, timeout: int) -> None:
-        """等待指定時間"""
-        page = await self._ensure_page()
-        await page.wait_for_timeout(timeout)
+        """等待指定時間（本地計時，不需經過 CDP）"""
+        self._ensure_page()
+        await asyncio.sleep(timeout / 1000)
 
     async def scroll(self, scroll_type: str, selector: str = "", pixels: int = 0) -> dict[str, Any]:
         """
@@ -294,12 +502,12 @@ class BrowserController:
         Returns:
             滾動結果
         """
-        page = await self._ensure_page()
+        page = self._ensure_page()
 
         if scroll_type == "top":
-            await page.evaluate("window.scrollTo(0, 0)")
+            await page.evaluate(self._SCROLL_TOP_JS)
         elif scroll_type == "bottom":
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await page.evaluate(self._SCROLL_BOTTOM_JS)
         elif scroll_type == "selector":
             if not selector:
                 raise RuntimeError("scroll_type=selector 時必須提供 selector")
@@ -307,31 +515,92 @@ class BrowserController:
             if element:
                 await element.scroll_into_view_if_needed()
         elif scroll_type == "pixels":
-            await page.evaluate(f"window.scrollBy(0, {pixels})")
+            await page.evaluate(self._SCROLL_BY_JS, pixels)
 
-        scroll_pos = await page.evaluate("({ x: window.scrollX, y: window.scrollY })")
+        scroll_pos = await self._cdp_eval(self._SCROLL_POS_JS)
         return {"scroll_position": scroll_pos}
 
+    async def batch(self, ops: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        並行執行多個互不相依的操作
+
+        每個操作格式為 {"method": "get_title", "args": {...}}，
+        以 asyncio.gather 同時送出，攤銷每次 CDP 往返的延遲。
+
+        Args:
+            ops: 操作列表
+
+        Returns:
+            與 ops 順序一致的結果列表，每項包含 success 與 data 或 error
+        """
+        self._ensure_page()
+        results = await asyncio.gather(*(self._dispatch(op) for op in ops), return_exceptions=True)
+        return {
+            "results": [
+                {"success": False, "error": str(result)} if isinstance(result, BaseException) else {"success": True, "data": result}
+                for result in results
+            ]
+        }
+
+    async def _dispatch(self, op: dict[str, Any]) -> Any:
+        """執行 batch 中的單一操作"""
+        method = op.get("method", "")
+        if method not in self._BATCH_METHODS:
+            raise ValueError(f"不支援批次執行的方法: {method}")
+        return await getattr(self, method)(**op.get("args", {}))
+
     # ═══════════════════════════════════════════════════════════════════════════════
     # 元素操作方法
     # ═══════════════════════════════════════════════════════════════════════════════
 
-    async def element_get_attribute(self, selector: str, index: int, name: str) -> dict[str, Any]:
-        """取得元素屬性"""
-        page = await self._ensure_page()
+    async def snapshot_selector(self, selector: str) -> dict[str, Any]:
+        """
+        查詢元素並快取 ElementHandle
+
+        之後的 element_* 操作帶入 token 即可重複使用，不必每次重新查詢。
+        使用完畢需呼叫 release_snapshot 釋放。
+
+        Args:
+            selector: CSS Selector
+
+        Returns:
+            快照 token 與元素數量
+        """
+        page = self._ensure_page()
         elements = await page.query_selector_all(selector)
+        token = f"snap-{next(self._handle_ids)}"
+        self._handles[token] = elements
+        return {"token": token, "count": len(elements)}
+
+    async def release_snapshot(self, token: str) -> dict[str, Any]:
+        """釋放快照，讓瀏覽器端回收 ElementHandle"""
+        elements = self._handles.pop(token, [])
+        await asyncio.gather(*(element.dispose() for element in elements), return_exceptions=True)
+        return {"success": True}
+
+    async def _get_element(self, selector: str, index: int, token: str = "") -> Any:
+        """依快照 token 或 selector 取得第 index 個元素"""
+        if token:
+            if token not in self._handles:
+                raise RuntimeError(f"快照不存在或已釋放: {token}")
+            elements = self._handles[token]
+        else:
+            page = self._ensure_page()
+            elements = await page.query_selector_all(selector)
         if index >= len(elements):
             raise RuntimeError(f"元素索引超出範圍: {index} >= {len(elements)}")
-        value = await elements[index].get_attribute(name)
+        return elements[index]
+
+    async def element_get_attribute(self, selector: str, index: int, name: str, token: str = "") -> dict[str, Any]:
+        """取得元素屬性"""
+        element = await self._get_element(selector, index, token)
+        value = await element.get_attribute(name)
         return {"value": value}
 
-    async def element_inner_text(self, selector: str, index: int) -> dict[str, Any]:
+    async def element_inner_text(self, selector: str, index: int, token: str = "") -> dict[str, Any]:
         """取得元素內部文字"""
-        page = await self._ensure_page()
-        elements = await page.query_selector_all(selector)
-        if index >= len(elements):
-            raise RuntimeError(f"元素索引超出範圍: {index} >= {len(elements)}")
-        text = await elements[index].inner_text()
+        element = await self._get_element(selector, index, token)
+        text = await element.inner_text()
         return {"text": text}
 
     # ═══════════════════════════════════════════════════════════════════════════════
@@ -345,9 +614,8 @@ class BrowserController:
         Returns:
             cookies 列表
         """
-        page = await self._ensure_page()
-        context = page.context
-        cookies = await context.cookies()
+        self._ensure_page()
+        cookies = await self._context.cookies()
         return {"cookies": cookies, "count": len(cookies)}
 
     async def add_cookie(self, cookie: dict[str, Any]) -> dict[str, Any]:
@@ -360,11 +628,24 @@ class BrowserController:
         Returns:
             操作結果
         """
-        page = await self._ensure_page()
-        context = page.context
-        await context.add_cookies([cookie])
+        self._ensure_page()
+        await self._context.add_cookies([cookie])
         return {"success": True, "cookie": cookie}
 
+    async def add_cookies(self, cookies: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        一次新增多個 cookies
+
+        Args:
+            cookies: cookie 物件列表
+
+        Returns:
+            操作結果
+        """
+        self._ensure_page()
+        await self._context.add_cookies(cookies)
+        return {"success": True, "count": len(cookies)}
+
     async def clear_cookies(self) -> dict[str, Any]:
         """
         清除當前 context 的所有 cookies
@@ -372,7 +653,6 @@ class BrowserController:
         Returns:
             操作結果
         """
-        page = await self._ensure_page()
-        context = page.context
-        await context.clear_cookies()
+        self._ensure_page()
+        await self._context.clear_cookies()
         return {"success": True}
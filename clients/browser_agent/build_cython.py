@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+以 Cython 編譯 WebSocketClient（選用）
+
+型別宣告位於 client.pxd，client.py 本身維持純 Python 原始碼。
+編譯產生的擴充模組會優先於 client.py 被匯入；刪除即退回純 Python。
+
+使用方式：
+    pip install cython
+    python build_cython.py build_ext --inplace
+"""
+
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name="browser-agent-client",
+    ext_modules=cythonize(
+        ["client.py"],
+        compiler_directives={
+            "language_level": 3,
+            "boundscheck": False,
+            "wraparound": False,
+        },
+    ),
+)
@@ -0,0 +1,20 @@
+# cython: language_level=3
+#
+# client.py 的 Cython 宣告（pure-python mode）
+# 以 python build_cython.py build_ext --inplace 編譯；未編譯時 client.py 照常以純 Python 執行。
+# 新增 WebSocketClient 實例屬性時需同步在此宣告。
+
+cdef class WebSocketClient:
+    cdef object _config
+    cdef object _browser
+    cdef object _websocket
+    cdef object _recv
+    cdef bint _running
+    cdef bint _binary_frames
+    cdef bint _batched_responses
+    cdef object _socket
+    cdef object _send_queue
+    cdef object _writer_task
+    cdef object _semaphore
+    cdef object _action_lock
+    cdef set _tasks
@@ -5,24 +5,56 @@ WebSocket 客戶端模組
 """
 
 import asyncio
-import json
 import logging
 import platform
-import time
-from collections.abc import Callable
+import socket
+import struct
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import datetime, timezone
 from typing import Any
 
 try:
-    import websockets
+    import orjson
 except ImportError:
-    print("Please install websockets: pip install websockets")
+    print("Please install orjson: pip install orjson")
     exit(1)
 
+try:
+    # SIMD 加速的 base64（API 相容標準庫），未安裝時退回標準庫
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+import transport  # type: ignore
 from browser import BrowserController  # type: ignore
 from config import Config  # type: ignore
+from transport import TransportClosed  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+# 本端支援的協定功能（於認證時告知 Server）
+CAPABILITIES = ["binary_frames", "add_cookies", "batch", "element_snapshots"]
+
+# 二進位 frame 格式：0x00 標記 + header 長度（4 bytes, big-endian）+ JSON header + 原始資料
+# 需與 mcp_server.remote.connection_manager 保持一致
+_BINARY_MARKER = b"\x00"
+_BINARY_HEADER = struct.Struct("!I")
+
+
+# 回應的固定前後段，request_id 與 data/error 直接拼接，不必先建立回應 dict
+_RESPONSE_PREFIX = b'{"type":"response","request_id":'
+_RESPONSE_OK_DATA = b',"success":true,"data":'
+_RESPONSE_ERROR = b',"success":false,"error":'
+_RESPONSE_BINARY_KEY = b',"binary_key":'
+_RESPONSE_UTF8 = b',"binary_encoding":"utf-8"'
+_RESPONSE_SUFFIX = b"}"
+
+
+def _iter_fragments(header: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """以二進位 frame 格式輸出分段訊息：首段為 header，其後為原始資料"""
+    yield b"".join((_BINARY_MARKER, _BINARY_HEADER.pack(len(header)), header))
+    yield from chunks
+
 
 class WebSocketClient:
     """
@@ -31,58 +63,86 @@ class WebSocketClient:
     連接 MCP Server，認證後接收指令並操作本地瀏覽器。
     """
 
+    # 單次合併發送的最大回應數量
+    _MAX_SEND_BATCH = 128
+
+    # 超過此大小（bytes 或字元數）的 JSON 解析/序列化移至執行緒，避免阻塞事件迴圈
+    _OFFLOAD_THRESHOLD = 65536
+
+    # 發送佇列上限：連線緩慢時讓指令處理等待，避免回應無限堆積
+    _SEND_QUEUE_SIZE = 1024
+
+    # 只有等待類指令可與其他指令並行（本身就在觀察頁面變化）；
+    # 讀取類指令仍以 _action_lock 排在先前的導覽/點擊之後，避免讀到舊頁面
+    _CONCURRENT_ACTIONS = frozenset(
+        {
+            "wait_for_selector",
+            "wait_for_url",
+            "wait_for_function",
+            "wait_for_timeout",
+        }
+    )
+
+    # 指令 -> 處理方法名稱（類別層級共用，執行時以 getattr 取得）
+    _HANDLERS = {
+        "navigate": "_handle_navigate",
+        "get_url": "_handle_get_url",
+        "get_title": "_handle_get_title",
+        "get_viewport": "_handle_get_viewport",
+        "screenshot": "_handle_screenshot",
+        "click": "_handle_click",
+        "type": "_handle_type",
+        "wait_for_selector": "_handle_wait_for_selector",
+        "query_selector_all": "_handle_query_selector_all",
+        "inner_text": "_handle_inner_text",
+        "get_content": "_handle_get_content",
+        "evaluate": "_handle_evaluate",
+        "wait_for_url": "_handle_wait_for_url",
+        "wait_for_function": "_handle_wait_for_function",
+        "wait_for_timeout": "_handle_wait_for_timeout",
+        "scroll": "_handle_scroll",
+        "batch": "_handle_batch",
+        "element_click": "_handle_element_click",
+        "element_type": "_handle_element_type",
+        "element_press": "_handle_element_press",
+        "element_inner_text": "_handle_element_inner_text",
+        "element_get_attribute": "_handle_element_get_attribute",
+        "element_screenshot": "_handle_element_screenshot",
+        "element_scroll_into_view": "_handle_element_scroll_into_view",
+        "snapshot_selector": "_handle_snapshot_selector",
+        "release_snapshot": "_handle_release_snapshot",
+        # Cookies 操作
+        "get_cookies": "_handle_get_cookies",
+        "add_cookie": "_handle_add_cookie",
+        "add_cookies": "_handle_add_cookies",
+        "clear_cookies": "_handle_clear_cookies",
+    }
+
     def __init__(self, config: Config, browser: BrowserController):
         self._config = config
         self._browser = browser
         self._websocket: Any = None
+        # 目前連線的 recv 方法，連線建立時綁定一次，run() 迴圈直接呼叫
+        self._recv: Callable[[], Awaitable[str | bytes]] | None = None
         self._running = False
-        self._handlers: dict[str, Callable] = {
-            "navigate": self._handle_navigate,
-            "get_url": self._handle_get_url,
-            "get_title": self._handle_get_title,
-            "get_viewport": self._handle_get_viewport,
-            "screenshot": self._handle_screenshot,
-            "click": self._handle_click,
-            "type": self._handle_type,
-            "wait_for_selector": self._handle_wait_for_selector,
-            "query_selector_all": self._handle_query_selector_all,
-            "inner_text": self._handle_inner_text,
-            "get_content": self._handle_get_content,
-            "evaluate": self._handle_evaluate,
-            "wait_for_url": self._handle_wait_for_url,
-            "wait_for_function": self._handle_wait_for_function,
-            "wait_for_timeout": self._handle_wait_for_timeout,
-            "scroll": self._handle_scroll,
-            "element_click": self._handle_element_click,
-            "element_type": self._handle_element_type,
-            "element_press": self._handle_element_press,
-            "element_inner_text": self._handle_element_inner_text,
-            "element_get_attribute": self._handle_element_get_attribute,
-            "element_screenshot": self._handle_element_screenshot,
-            "element_scroll_into_view": self._handle_element_scroll_into_view,
-            # Cookies 操作
-            "get_cookies": self._handle_get_cookies,
-            "add_cookie": self._handle_add_cookie,
-            "clear_cookies": self._handle_clear_cookies,
-        }
+        self._binary_frames = False
+        self._batched_responses = False
+        self._socket: Any = None
+        self._send_queue: asyncio.Queue[bytes | Iterator[bytes]] | None = None
+        self._writer_task: asyncio.Task | None = None
+        # 指令以獨立 Task 執行，接收迴圈不必等待前一個指令完成
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self._action_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
 
     def _is_connected(self) -> bool:
         """
-        檢查 WebSocket 連線狀態（兼容 websockets 新舊版本）
+        檢查 WebSocket 連線狀態
 
         Returns:
             是否已連接
         """
-        if not self._websocket:
-            return False
-
-        # websockets >= 11.0 使用 state 屬性
-        if hasattr(self._websocket, 'state'):
-            from websockets.protocol import State
-            return self._websocket.state == State.OPEN
-
-        # websockets < 11.0 使用 closed 屬性
-        return not getattr(self._websocket, 'closed', True)
+        return self._websocket is not None and self._websocket.is_open
 
     async def connect(self) -> bool:
         """
@@ -92,12 +152,15 @@ class WebSocketClient:
             是否連接成功
         """
         try:
-            logger.info(f"🔗 正在連接到 MCP Server: {self._config.server_url}")
-            self._websocket = await websockets.connect(
+            logger.info("🔗 正在連接到 MCP Server: %s", self._config.server_url)
+            self._websocket = await transport.connect(
                 self._config.server_url,
                 ping_interval=self._config.heartbeat_interval,
                 ping_timeout=10,
             )
+            logger.debug("WebSocket 後端: %s", self._websocket.backend)
+            self._recv = self._websocket.recv
+            self._tune_socket()
 
             # 發送認證訊息
             auth_message = {
@@ -105,21 +168,26 @@ class WebSocketClient:
                 "token": self._config.token,
                 "client_id": self._config.client_id,
                 "user_agent": f"BrowserAgent/1.0 ({platform.system()} {platform.release()})",
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "capabilities": CAPABILITIES,
             }
-            await self._websocket.send(json.dumps(auth_message))
+            await self._websocket.send(orjson.dumps(auth_message))
             logger.info("已發送認證請求...")
 
             # 等待認證回應
             response = await asyncio.wait_for(self._websocket.recv(), timeout=10.0)
-            data = json.loads(response)
+            data = orjson.loads(response)
 
             if data.get("type") == "auth_success":
                 logger.info("✅ 認證成功！已連接到 MCP Server")
+                server_capabilities = data.get("capabilities", [])
+                self._binary_frames = "binary_frames" in server_capabilities
+                self._batched_responses = "batched_responses" in server_capabilities
+                self._start_writer()
                 return True
             else:
                 error_msg = data.get("message", "認證失敗")
-                logger.error(f"❌ 認證失敗: {error_msg}")
+                logger.error("❌ 認證失敗: %s", error_msg)
                 await self._websocket.close()
                 return False
 
@@ -127,9 +195,35 @@ class WebSocketClient:
             logger.error("❌ 認證逾時")
             return False
         except Exception as e:
-            logger.exception(f"❌ 連接失敗: {e}")
+            logger.exception("❌ 連接失敗: %s", e)
             return False
 
+    def _tune_socket(self) -> None:
+        """
+        調整底層 TCP socket
+
+        關閉 Nagle 演算法，小型回應不必等待延遲合併即送出；
+        多筆回應的合併改由 _writer 以 TCP_CORK 控制。
+        """
+        self._socket = None
+        try:
+            sock = self._websocket.socket
+            if sock is None:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket = sock
+        except (AttributeError, OSError) as e:
+            logger.debug("無法設定 TCP_NODELAY: %s", e)
+
+    def _set_cork(self, enabled: bool) -> None:
+        """切換 TCP_CORK（僅 Linux 支援）"""
+        if self._socket is None or not hasattr(socket, "TCP_CORK"):
+            return
+        try:
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, int(enabled))
+        except OSError:
+            pass
+
     async def run(self) -> None:
         """
         執行主迴圈：接收訊息並處理指令
@@ -146,18 +240,122 @@ class WebSocketClient:
                     continue
 
                 # 接收訊息
-                message = await self._websocket.recv()
+                message = await self._recv()
                 await self._handle_message(message)
 
-            except websockets.ConnectionClosed:
+            except TransportClosed:
                 logger.warning("🔴 與 MCP Server 的連線已斷開")
+                self._stop_writer()
                 self._websocket = None
+                self._recv = None
             except Exception as e:
-                logger.exception(f"處理訊息時發生錯誤: {e}")
+                logger.exception("處理訊息時發生錯誤: %s", e)
+
+    def _start_writer(self) -> None:
+        """為目前連線建立發送佇列與寫入 Task"""
+        self._stop_writer()
+        self._send_queue = asyncio.Queue(maxsize=self._SEND_QUEUE_SIZE)
+        self._writer_task = asyncio.create_task(self._writer(self._websocket, self._send_queue, self._batched_responses))
+
+    def _stop_writer(self) -> None:
+        """停止寫入 Task（尚未送出的回應隨連線一併捨棄）"""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._send_queue = None
+
+    async def _writer(self, websocket: Any, queue: "asyncio.Queue[bytes | Iterator[bytes]]", batch_documents: bool) -> None:
+        """
+        發送佇列消費者
+
+        取出第一筆回應後，一併取出所有已就緒的回應；
+        Server 支援 batched_responses 時，多筆 JSON 回應合併為單一陣列 frame 發送，減少 frame 數與 socket 寫入次數，
+        否則（舊版 Server 無法解析陣列）逐一發送。二進位 frame 與分段串流一律逐一發送。
+        """
+        send = websocket.send
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self._MAX_SEND_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            # 多個 frame 時以 TCP_CORK 合併為完整封包再送出
+            corked = len(batch) > 1
+            if corked:
+                self._set_cork(True)
+            try:
+                documents = []
+                for message in batch:
+                    if not isinstance(message, bytes) or message.startswith(_BINARY_MARKER):
+                        await send(message)
+                    else:
+                        documents.append(message)
+                if len(documents) > 1 and batch_documents:
+                    await send(b"[" + b",".join(documents) + b"]")
+                else:
+                    for document in documents:
+                        await send(document)
+            except TransportClosed:
+                logger.warning("🔴 發送回應時連線已斷開")
+                return
+            finally:
+                if corked:
+                    self._set_cork(False)
+
+    async def _encode_response(self, request_id: int | str, result: Any) -> bytes | Iterator[bytes]:
+        """
+        序列化成功回應（orjson 直接輸出 bytes，省去 str -> bytes 的轉換）
+
+        一般結果以固定位元組樣板拼接；
+        若結果含有 bytes 欄位（如截圖），Server 支援時以二進位 frame 傳送原始資料；
+        否則轉為舊版的 base64 欄位。
+        若結果含有 UTF-8 分段迭代器（如 get_content_stream），
+        則以 header + 各分段組成單一分段訊息。
+        """
+        binary_key = None
+        if isinstance(result, dict):
+            binary_key = next((k for k, v in result.items() if isinstance(v, (bytes, Iterator))), None)
+        if binary_key is None:
+            if self._is_large(result):
+                body = await asyncio.to_thread(orjson.dumps, result)
+            else:
+                body = orjson.dumps(result)
+            return b"".join((_RESPONSE_PREFIX, orjson.dumps(request_id), _RESPONSE_OK_DATA, body, _RESPONSE_SUFFIX))
+
+        # 二進位回應的 header 同樣以樣板拼接，binary_key 等欄位附加在 data 之後
+        payload = result.pop(binary_key)
+        prefix = (_RESPONSE_PREFIX, orjson.dumps(request_id), _RESPONSE_OK_DATA)
+        if isinstance(payload, Iterator):
+            header = b"".join((*prefix, orjson.dumps(result), _RESPONSE_BINARY_KEY, orjson.dumps(binary_key), _RESPONSE_UTF8, _RESPONSE_SUFFIX))
+            return _iter_fragments(header, payload)
+
+        if self._binary_frames:
+            header = b"".join((*prefix, orjson.dumps(result), _RESPONSE_BINARY_KEY, orjson.dumps(binary_key), _RESPONSE_SUFFIX))
+            return b"".join((_BINARY_MARKER, _BINARY_HEADER.pack(len(header)), header, payload))
+
+        # 舊版 Server：base64 編碼移至 executor 避免阻塞事件迴圈
+        encoded = await asyncio.get_running_loop().run_in_executor(None, base64.b64encode, payload)
+        result["base64"] = encoded.decode("ascii")
+        return b"".join((*prefix, orjson.dumps(result), _RESPONSE_SUFFIX))
+
+    def _is_large(self, result: Any) -> bool:
+        """粗估結果序列化後是否過大（僅檢查第一層的字串與列表長度）"""
+        values = result.values() if isinstance(result, dict) else (result,)
+        return any(isinstance(v, (str, list)) and len(v) > self._OFFLOAD_THRESHOLD for v in values)
+
+    async def _send(self, message: bytes | Iterator[bytes], queue: "asyncio.Queue[bytes | Iterator[bytes]] | None") -> None:
+        """
+        將已序列化的訊息放入指令所屬連線的發送佇列
+
+        連線已中斷或已換成新連線時拋出 RuntimeError，
+        避免舊連線的回應送到新連線，或放入已無寫入 Task 消費的佇列而卡住。
+        """
+        if queue is None or queue is not self._send_queue:
+            raise RuntimeError("WebSocket 未連線")
+        await queue.put(message)
 
     async def _reconnect(self) -> bool:
         """重新連接"""
-        logger.info(f"嘗試重新連接（{self._config.reconnect_interval}秒後）...")
+        logger.info("嘗試重新連接（%s秒後）...", self._config.reconnect_interval)
         await asyncio.sleep(self._config.reconnect_interval)
 
         # 確保瀏覽器已連接
@@ -167,58 +365,75 @@ class WebSocketClient:
 
         return await self.connect()
 
-    async def _handle_message(self, message: str) -> None:
+    async def _handle_message(self, message: str | bytes) -> None:
         """處理來自 MCP Server 的訊息"""
         try:
-            data = json.loads(message)
+            if len(message) > self._OFFLOAD_THRESHOLD:
+                data = await asyncio.to_thread(orjson.loads, message)
+            else:
+                data = orjson.loads(message)
             msg_type = data.get("type")
 
             if msg_type == "command":
-                await self._handle_command(data)
+                # 達到並行上限時在此等待，暫停接收新訊息
+                await self._semaphore.acquire()
+                # 指令綁定收到時的連線佇列，回應只會送回同一條連線
+                task = asyncio.create_task(self._run_command(data, self._send_queue))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
             else:
-                logger.warning(f"未知訊息類型: {msg_type}")
+                logger.warning("未知訊息類型: %s", msg_type)
 
-        except json.JSONDecodeError:
-            logger.warning(f"無法解析訊息: {message[:100]}")
+        except orjson.JSONDecodeError:
+            preview = message[:100]
+            if isinstance(preview, bytes):
+                preview = preview.decode("utf-8", "replace")
+            logger.warning("無法解析訊息: %s", preview)
         except Exception as e:
-            logger.exception(f"處理訊息錯誤: {e}")
+            logger.exception("處理訊息錯誤: %s", e)
 
-    async def _handle_command(self, data: dict[str, Any]) -> None:
+    async def _run_command(self, data: dict[str, Any], queue: "asyncio.Queue[bytes | Iterator[bytes]] | None") -> None:
+        """執行單一指令並釋放並行名額（會改變頁面狀態的指令依序執行）"""
+        try:
+            if data.get("action") in self._CONCURRENT_ACTIONS:
+                await self._handle_command(data, queue)
+            else:
+                async with self._action_lock:
+                    await self._handle_command(data, queue)
+        except Exception as e:
+            # 執行期間連線中斷，回應無法送出（Server 端的等待會逾時），記錄後結束 Task
+            logger.warning("指令回應未送出: %s (request_id: %s): %s", data.get("action", ""), data.get("request_id", ""), e)
+        finally:
+            self._semaphore.release()
+
+    async def _handle_command(self, data: dict[str, Any], queue: "asyncio.Queue[bytes | Iterator[bytes]] | None") -> None:
         """處理指令"""
         request_id = data.get("request_id", "")
         action = data.get("action", "")
         params = data.get("params", {})
 
-        logger.info(f"📥 收到指令: {action} (request_id: {request_id})")
+        logger.info("📥 收到指令: %s (request_id: %s)", action, request_id)
 
+        response: bytes | Iterator[bytes]
         try:
             # 查找處理器
-            handler = self._handlers.get(action)
-            if not handler:
-                raise ValueError(f"未知的指令: {action}")
+            try:
+                name = self._HANDLERS[action]
+            except KeyError:
+                raise ValueError(f"未知的指令: {action}") from None
+            handler = getattr(self, name)
 
             # 執行指令
             result = await handler(params)
-
-            # 回傳成功結果
-            response = {
-                "type": "response",
-                "request_id": request_id,
-                "success": True,
-                "data": result,
-            }
-            await self._websocket.send(json.dumps(response))
-            logger.info(f"📤 指令執行成功: {action}")
+            response = await self._encode_response(request_id, result)
+            logger.info("📤 指令執行成功: %s", action)
 
         except Exception as e:
-            logger.exception(f"指令執行失敗: {action}")
-            response = {
-                "type": "response",
-                "request_id": request_id,
-                "success": False,
-                "error": str(e),
-            }
-            await self._websocket.send(json.dumps(response))
+            logger.exception("指令執行失敗: %s", action)
+            response = b"".join((_RESPONSE_PREFIX, orjson.dumps(request_id), _RESPONSE_ERROR, orjson.dumps(str(e)), _RESPONSE_SUFFIX))
+
+        # 回傳結果；連線已中斷時拋出的 RuntimeError 由 _run_command 記錄
+        await self._send(response, queue)
 
     # ═══════════════════════════════════════════════════════════════════════════════
     # 指令處理器
@@ -289,7 +504,9 @@ class WebSocketClient:
         return await self._browser.inner_text(selector=params["selector"])
 
     async def _handle_get_content(self, params: dict[str, Any]) -> dict[str, Any]:
-        """處理取得 HTML 指令"""
+        """處理取得 HTML 指令（Server 支援二進位 frame 時分段串流傳送）"""
+        if self._binary_frames:
+            return {"html": await self._browser.get_content_stream()}
         return await self._browser.get_content()
 
     async def _handle_evaluate(self, params: dict[str, Any]) -> dict[str, Any]:
@@ -328,6 +545,10 @@ class WebSocketClient:
             pixels=params.get("pixels", 0),
         )
 
+    async def _handle_batch(self, params: dict[str, Any]) -> dict[str, Any]:
+        """處理批次指令"""
+        return await self._browser.batch(ops=params["ops"])
+
     # ═══════════════════════════════════════════════════════════════════════════════
     # 元素操作處理器
     # ═══════════════════════════════════════════════════════════════════════════════
@@ -350,28 +571,29 @@ class WebSocketClient:
 
     async def _handle_element_press(self, params: dict[str, Any]) -> dict[str, Any]:
         """處理元素按鍵指令"""
-        # 重新使用 type_text 來模擬按鍵
-        page = await self._browser._ensure_page()
-        elements = await page.query_selector_all(params["selector"])
-        index = params.get("index", 0)
-        if index >= len(elements):
-            raise RuntimeError(f"元素索引超出範圍: {index} >= {len(elements)}")
-        await elements[index].press(params["key"])
+        element = await self._browser._get_element(
+            selector=params.get("selector", ""),
+            index=params.get("index", 0),
+            token=params.get("token", ""),
+        )
+        await element.press(params["key"])
         return {"success": True}
 
     async def _handle_element_inner_text(self, params: dict[str, Any]) -> dict[str, Any]:
         """處理元素文字指令"""
         return await self._browser.element_inner_text(
-            selector=params["selector"],
+            selector=params.get("selector", ""),
             index=params.get("index", 0),
+            token=params.get("token", ""),
         )
 
     async def _handle_element_get_attribute(self, params: dict[str, Any]) -> dict[str, Any]:
         """處理元素屬性指令"""
         return await self._browser.element_get_attribute(
-            selector=params["selector"],
+            selector=params.get("selector", ""),
             index=params.get("index", 0),
             name=params["name"],
+            token=params.get("token", ""),
         )
 
     async def _handle_element_screenshot(self, params: dict[str, Any]) -> dict[str, Any]:
@@ -388,6 +610,14 @@ class WebSocketClient:
             selector=params["selector"],
         )
 
+    async def _handle_snapshot_selector(self, params: dict[str, Any]) -> dict[str, Any]:
+        """處理建立元素快照指令"""
+        return await self._browser.snapshot_selector(selector=params["selector"])
+
+    async def _handle_release_snapshot(self, params: dict[str, Any]) -> dict[str, Any]:
+        """處理釋放元素快照指令"""
+        return await self._browser.release_snapshot(token=params["token"])
+
     # ═══════════════════════════════════════════════════════════════════════════════
     # Cookies 處理器
     # ═══════════════════════════════════════════════════════════════════════════════
@@ -400,6 +630,10 @@ class WebSocketClient:
         """處理新增 cookie 指令"""
         return await self._browser.add_cookie(cookie=params["cookie"])
 
+    async def _handle_add_cookies(self, params: dict[str, Any]) -> dict[str, Any]:
+        """處理批次新增 cookies 指令"""
+        return await self._browser.add_cookies(cookies=params["cookies"])
+
     async def _handle_clear_cookies(self, params: dict[str, Any]) -> dict[str, Any]:
         """處理清除 cookies 指令"""
         return await self._browser.clear_cookies()
@@ -407,6 +641,9 @@ class WebSocketClient:
     async def stop(self) -> None:
         """停止客戶端"""
         self._running = False
+        for task in self._tasks:
+            task.cancel()
+        self._stop_writer()
         if self._websocket:
             try:
                 await self._websocket.close()
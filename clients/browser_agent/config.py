@@ -40,6 +40,9 @@ class Config:
     # 操作逾時（秒）
     operation_timeout: float = 60.0
 
+    # 同時執行的指令數上限
+    max_concurrency: int = 8
+
     @classmethod
     def from_env(cls) -> "Config":
         """從環境變數載入配置"""
@@ -54,4 +57,5 @@ class Config:
             reconnect_interval=float(os.getenv("RECONNECT_INTERVAL", "5.0")),
             heartbeat_interval=float(os.getenv("HEARTBEAT_INTERVAL", "30.0")),
             operation_timeout=float(os.getenv("OPERATION_TIMEOUT", "60.0")),
+            max_concurrency=int(os.getenv("MAX_CONCURRENCY", "8")),
         )
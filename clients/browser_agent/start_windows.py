@@ -20,6 +20,7 @@ Usage:
 
 from __future__ import annotations
 
+import http.client
 import os
 import subprocess
 import sys
@@ -133,11 +134,24 @@ def wait_for_cdp(port: int, timeout: int = 10) -> bool:
     """Wait for Chrome CDP to be ready."""
     print("[WAIT] Waiting for Chrome CDP to start...")
 
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        if check_cdp_running(port):
-            return True
-        time.sleep(0.5)
+    # Reuse one connection across polls; back off 50ms -> 400ms while Chrome is still starting
+    conn = http.client.HTTPConnection("localhost", port, timeout=2)
+    delay = 0.05
+    deadline_ns = time.monotonic_ns() + timeout * 1_000_000_000
+    try:
+        while time.monotonic_ns() < deadline_ns:
+            try:
+                conn.request("GET", "/json/version")
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    return True
+            except (OSError, http.client.HTTPException):
+                conn.close()
+            time.sleep(delay)
+            delay = min(delay * 2, 0.4)
+    finally:
+        conn.close()
 
     return False
 
@@ -0,0 +1,212 @@
+"""
+WebSocket 傳輸層
+
+統一 picows（Cython 實作）與 websockets 兩種後端的連線介面。
+已安裝 picows 時優先使用，否則退回 websockets。
+"""
+
+import asyncio
+import inspect
+import logging
+from collections.abc import Iterator
+from typing import Any
+
+try:
+    import picows
+except ImportError:
+    picows = None
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+try:
+    from websockets.protocol import State
+
+    _STATE_OPEN = State.OPEN
+except ImportError:
+    _STATE_OPEN = None
+
+logger = logging.getLogger(__name__)
+
+if picows is None and websockets is None:
+    print("Please install websockets: pip install websockets")
+    exit(1)
+
+# 單一訊息上限（整頁截圖、大型 HTML），需與 Server 端設定一致
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+class TransportClosed(Exception):
+    """WebSocket 連線已關閉"""
+
+
+class WebSocketsTransport:
+    """websockets 後端"""
+
+    backend = "websockets"
+
+    def __init__(self, websocket: Any) -> None:
+        self._websocket = websocket
+        # 連線時即判定 websockets 版本的狀態 API，is_open 不必每次檢查
+        # websockets >= 11.0 使用 state 屬性；< 11.0 使用 closed 屬性
+        self._has_state = _STATE_OPEN is not None and hasattr(websocket, "state")
+        # websockets >= 13.0 可略過文字 frame 的 UTF-8 解碼，直接交給 orjson 解析 bytes
+        self._recv_kwargs = {"decode": False} if "decode" in inspect.signature(websocket.recv).parameters else {}
+
+    @classmethod
+    async def connect(cls, url: str, ping_interval: float, ping_timeout: float) -> "WebSocketsTransport":
+        # 訊息多為小型 JSON 與已壓縮的 PNG，permessage-deflate 只會增加 CPU 負擔
+        websocket = await websockets.connect(
+            url,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            compression=None,
+            max_size=MAX_MESSAGE_SIZE,
+            max_queue=32,
+            write_limit=2**20,
+        )
+        return cls(websocket)
+
+    @property
+    def is_open(self) -> bool:
+        """連線是否開啟（兼容 websockets 新舊版本）"""
+        if self._has_state:
+            return self._websocket.state == _STATE_OPEN
+        return not self._websocket.closed
+
+    @property
+    def socket(self) -> Any:
+        """底層 TCP socket"""
+        return self._websocket.transport.get_extra_info("socket")
+
+    async def send(self, message: bytes | Iterator[bytes]) -> None:
+        """發送訊息（迭代器會以分段 frame 發送）"""
+        try:
+            await self._websocket.send(message)
+        except websockets.ConnectionClosed as e:
+            raise TransportClosed from e
+
+    async def recv(self) -> str | bytes:
+        """接收一則完整訊息（支援時文字訊息也以 bytes 回傳）"""
+        try:
+            return await self._websocket.recv(**self._recv_kwargs)
+        except websockets.ConnectionClosed as e:
+            raise TransportClosed from e
+
+    async def close(self) -> None:
+        await self._websocket.close()
+
+
+if picows is not None:
+
+    class _PicowsListener(picows.WSListener):
+        """將收到的 frame 組合為完整訊息後放入佇列"""
+
+        def __init__(self) -> None:
+            self.messages: asyncio.Queue[bytes | None] = asyncio.Queue()
+            self._fragments: list[bytes] = []
+            self.disconnected = False
+
+        def on_ws_frame(self, transport: Any, frame: Any) -> None:
+            msg_type = frame.msg_type
+            if msg_type == picows.WSMsgType.CLOSE:
+                transport.send_close(frame.get_close_code())
+                transport.disconnect()
+                return
+            if msg_type not in (picows.WSMsgType.TEXT, picows.WSMsgType.BINARY, picows.WSMsgType.CONTINUATION):
+                return
+
+            # frame 的 payload 只在回呼期間有效，需立即複製
+            # 文字訊息同樣以 bytes 交出，不做 UTF-8 解碼（orjson 解析時會驗證）
+            if frame.fin and msg_type != picows.WSMsgType.CONTINUATION:
+                self.messages.put_nowait(frame.get_payload_as_bytes())
+                return
+
+            self._fragments.append(frame.get_payload_as_bytes())
+            if frame.fin:
+                self.messages.put_nowait(b"".join(self._fragments))
+                self._fragments.clear()
+
+        def on_ws_disconnected(self, transport: Any) -> None:
+            self.disconnected = True
+            self.messages.put_nowait(None)
+
+    class PicowsTransport:
+        """picows 後端"""
+
+        backend = "picows"
+
+        def __init__(self, transport: Any, listener: _PicowsListener) -> None:
+            self._transport = transport
+            self._listener = listener
+
+        @classmethod
+        async def connect(cls, url: str, ping_interval: float, ping_timeout: float) -> "PicowsTransport":
+            transport, listener = await picows.ws_connect(
+                _PicowsListener,
+                url,
+                enable_auto_ping=True,
+                auto_ping_idle_timeout=ping_interval,
+                auto_ping_reply_timeout=ping_timeout,
+                # picows < 1.8.0 固定 1 MiB 上限且不接受此參數，connect() 會退回 websockets
+                max_frame_size=MAX_MESSAGE_SIZE,
+            )
+            return cls(transport, listener)
+
+        @property
+        def is_open(self) -> bool:
+            return not self._listener.disconnected
+
+        @property
+        def socket(self) -> Any:
+            return self._transport.underlying_transport.get_extra_info("socket")
+
+        async def send(self, message: bytes | Iterator[bytes]) -> None:
+            """發送訊息（迭代器會以分段 frame 發送）"""
+            if not self.is_open:
+                raise TransportClosed
+            if isinstance(message, bytes):
+                self._transport.send(picows.WSMsgType.BINARY, message)
+                return
+
+            # 預讀下一段以判斷目前是否為最後一段
+            msg_type = picows.WSMsgType.BINARY
+            chunks = iter(message)
+            current = next(chunks, b"")
+            for following in chunks:
+                self._transport.send(msg_type, current, fin=False)
+                msg_type = picows.WSMsgType.CONTINUATION
+                current = following
+                # 讓出事件迴圈，避免長訊息阻塞其他 Task
+                await asyncio.sleep(0)
+            self._transport.send(msg_type, current, fin=True)
+
+        async def recv(self) -> bytes:
+            """接收一則完整訊息"""
+            if self._listener.disconnected and self._listener.messages.empty():
+                raise TransportClosed
+            message = await self._listener.messages.get()
+            if message is None:
+                raise TransportClosed
+            return message
+
+        async def close(self) -> None:
+            if not self._listener.disconnected:
+                self._transport.send_close(picows.WSCloseCode.OK)
+                self._transport.disconnect()
+            await self._transport.wait_disconnected()
+
+
+async def connect(url: str, ping_interval: float, ping_timeout: float = 10) -> "WebSocketsTransport | PicowsTransport":
+    """以可用的最快後端建立 WebSocket 連線（picows 連線失敗時退回 websockets）"""
+    if picows is not None:
+        if websockets is None:
+            return await PicowsTransport.connect(url, ping_interval, ping_timeout)
+        try:
+            return await PicowsTransport.connect(url, ping_interval, ping_timeout)
+        except Exception as e:
+            # 舊版 picows 不支援部分連線參數時會拋出 TypeError，改用 websockets 重試
+            logger.warning("picows 連線失敗，改用 websockets: %s", e)
+    return await WebSocketsTransport.connect(url, ping_interval, ping_timeout)
@@ -4,47 +4,36 @@ MCP Server 主入口
 可透過 python -m mcp_server 或直接執行啟動伺服器
 """
 
+import logging
+import os
 import sys
 
-import uvicorn
-
 from mcp_server.base.logging_config import setup_logging
 from mcp_server.config import (
     API_KEYS,
-    GEMINI_API_KEYS,
-    GEMINI_PAY_KEY,
-    GEMINI_PROXY_URL,
     MAX_EXECUTION_TIME,
     MCP_PORT,
-    OLLAMA_PROXY_URL,
+    MCP_WORKERS,
+    MULTI_WORKER_ENV,
+    REMOTE_BROWSER_ENABLED,
     WORK_DIR,
     cleanup_work_directory,
 )
-from mcp_server.model.gemini_api_client import configure_client
-from mcp_server.tools import registry
 
 
 def main():
     """主函式"""
     # 設定日誌
-    import logging
     setup_logging(file_log_level=logging.INFO)
 
     # 清理工作目錄
     cleanup_work_directory()
 
-    # 配置 Gemini API 用戶端
-    configure_client(
-        api_keys=GEMINI_API_KEYS,
-        pay_key=GEMINI_PAY_KEY,
-        proxy_url=GEMINI_PROXY_URL,
-        ollama_proxy_url=OLLAMA_PROXY_URL,
-    )
-
-    # 取得 app 實例
-    import logging
+    # 以下模組載入成本高（uvicorn、FastAPI、所有 Tools），延後到實際啟動時才匯入
+    # Gemini API 用戶端於 app 的 lifespan 中配置，多 worker 時每個 process 各自配置
+    import uvicorn
 
-    from mcp_server.app import app
+    from mcp_server.tools import registry
 
     logger = logging.getLogger(__name__)
     logger.info("🚀 MCP 伺服器啟動 [v4.0.0]")
@@ -58,8 +47,28 @@ def main():
     else:
         logger.warning("⚠️ API Key 認證: 已停用（開發模式）")
 
-    # 啟動伺服器
-    uvicorn.run(app, host="0.0.0.0", port=MCP_PORT)
+    # 遠端 Browser Agent 只會連上其中一個 process，其他 worker 無法使用，故啟用時只開一個 worker
+    workers = MCP_WORKERS
+    if workers > 1 and REMOTE_BROWSER_ENABLED:
+        logger.warning(f"⚠️ 遠端瀏覽器已啟用，忽略 MCP_WORKERS={workers}，改以單一 worker 啟動")
+        workers = 1
+    logger.info(f"👷 Worker 數: {workers}")
+    if workers > 1:
+        # 工作目錄已於上方清理；各 worker（含 uvicorn 重啟的 worker）不可再清理，以免刪除其他 worker 使用中的檔案
+        os.environ[MULTI_WORKER_ENV] = "1"
+
+    # 啟動伺服器（uvicorn[standard] 已包含 uvloop 與 httptools；uvloop 不支援 Windows）
+    # 多 worker 需以 import 字串指定 app，讓各 worker process 自行載入
+    uvicorn.run(
+        "mcp_server.app:app",
+        host="0.0.0.0",
+        port=MCP_PORT,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+        backlog=4096,
+        timeout_keep_alive=30,
+    )
 
 
 if __name__ == "__main__":
@@ -4,77 +4,181 @@ NATE-MCP-SERVER v4.0.0 (Refactored)
 完全模組化重構版本，Tool 定義分散到獨立檔案中
 """
 
+import asyncio
+import functools
 import logging
+import os
+import platform
+import time
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
+from typing import Any
 
+import msgspec
+import orjson
 from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from mcp_server.base.logging_config import setup_logging, stop_logging
 from mcp_server.config import (
     API_KEYS,
+    GEMINI_API_KEYS,
+    GEMINI_PAY_KEY,
+    GEMINI_PROXY_URL,
+    IS_WORKER_PROCESS,
     MAX_EXECUTION_TIME,
     MCP_HOST,
     MCP_PORT,
+    OLLAMA_PROXY_URL,
     REMOTE_BROWSER_ENABLED,
     WORK_DIR,
+    cleanup_work_directory,
 )
-from mcp_server.schemas import MCPError  # noqa: E402
-from mcp_server.security import filter_allowed_tools, is_tool_allowed, verify_api_key  # noqa: E402
+from mcp_server.model.gemini_api_client import configure_client, get_client
+from mcp_server.remote.connection_manager import remote_connection_manager
+from mcp_server.schemas import MCPError, MCPRequest  # noqa: E402
+from mcp_server.security import PermissionKey, filter_allowed_tools, get_permission_key, is_tool_allowed, verify_api_key  # noqa: E402
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 關鍵：載入所有 Tools（透過 tools/__init__.py 自動註冊）
 # ═══════════════════════════════════════════════════════════════════════════════
 from mcp_server.tools import registry  # noqa: E402
-from mcp_server.utils import format_tool_result  # noqa: E402
+from mcp_server.utils import encode_tool_result  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# JSON 回應 - 以 orjson 序列化，並略過 FastAPI 的 jsonable_encoder
+# ═══════════════════════════════════════════════════════════════════════════════
+class MCPJSONResponse(JSONResponse):
+    """orjson 序列化的 JSON 回應（無法直接序列化的值，如 Path、Decimal，轉為字串）"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CORS - 允許任意來源，標頭預先組好
+# ═══════════════════════════════════════════════════════════════════════════════
+_CORS_ALLOW_ORIGIN = (b"access-control-allow-origin", b"*")
+_CORS_PREFLIGHT_HEADERS = [
+    _CORS_ALLOW_ORIGIN,
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+    (b"content-length", b"0"),
+]
+
+
+class WildcardCORSMiddleware:
+    """
+    等同 CORSMiddleware(allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]) 的精簡 ASGI middleware
+
+    無 Origin 標頭的請求直接放行；預檢請求以預先組好的標頭直接回應；
+    其餘回應僅附加 Access-Control-Allow-Origin，不解析或重建標頭。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        has_origin = is_preflight = False
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                has_origin = True
+            elif name == b"access-control-request-method":
+                is_preflight = scope["method"] == "OPTIONS"
+            elif name == b"access-control-request-headers":
+                request_headers = value
+        if not has_origin:
+            await self.app(scope, receive, send)
+            return
+
+        if is_preflight:
+            headers = _CORS_PREFLIGHT_HEADERS if request_headers is None else [*_CORS_PREFLIGHT_HEADERS, (b"access-control-allow-headers", request_headers)]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), _CORS_ALLOW_ORIGIN]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+# 請求解碼器（重複使用，避免每次請求重建型別資訊）
+_request_decoder = msgspec.json.Decoder(MCPRequest)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Lifespan 管理 - 啟動/關閉 WebSocket Server
 # ═══════════════════════════════════════════════════════════════════════════════
+async def _start_remote_server() -> None:
+    """啟動遠端瀏覽器 WebSocket Server（失敗時僅記錄，不中斷啟動）"""
+    if not REMOTE_BROWSER_ENABLED:
+        return
+    try:
+        logger.info("🔗 正在啟動遠端瀏覽器 WebSocket Server...")
+        await remote_connection_manager.start_server()
+    except Exception as e:
+        logger.exception("❌ 啟動遠端瀏覽器 WebSocket Server 失敗: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     FastAPI Lifespan 管理器
 
-    啟動時：初始化日誌、清理暫存區、啟動遠端瀏覽器 WebSocket Server
-    關閉時：停止 WebSocket Server
-    """
-    from mcp_server.base.logging_config import setup_logging
-    from mcp_server.config import cleanup_work_directory
+    啟動時：初始化日誌、清理暫存區、配置 Gemini API 用戶端、啟動遠端瀏覽器 WebSocket Server
+    關閉時：停止 WebSocket Server、關閉 Gemini API 連線、停止背景日誌執行緒
 
+    多 worker 模式下每個 worker process 都會各自執行一次；
+    此時工作目錄只由主 process 清理，日誌檔依 pid 分開，避免多個 process 同時輪替同一檔案。
+    """
     # 初始化日誌系統
-    setup_logging()
+    if IS_WORKER_PROCESS:
+        setup_logging(log_file=f"mcp_server.{os.getpid()}.log")
+    else:
+        setup_logging()
     logger.info("🚀 MCP 伺服器初始化中...")
 
-    # 清理工作目錄
-    cleanup_work_directory()
-
-    # 啟動遠端瀏覽器 WebSocket Server
-    if REMOTE_BROWSER_ENABLED:
-        try:
-            from mcp_server.remote.connection_manager import remote_connection_manager
+    # 配置 Gemini API 用戶端
+    configure_client(
+        api_keys=GEMINI_API_KEYS,
+        pay_key=GEMINI_PAY_KEY,
+        proxy_url=GEMINI_PROXY_URL,
+        ollama_proxy_url=OLLAMA_PROXY_URL,
+    )
 
-            logger.info("🔗 正在啟動遠端瀏覽器 WebSocket Server...")
-            await remote_connection_manager.start_server()
-        except ImportError:
-            logger.warning("⚠️ 無法導入遠端連線模組，遠端瀏覽器功能已停用")
-        except Exception as e:
-            logger.exception(f"❌ 啟動遠端瀏覽器 WebSocket Server 失敗: {e}")
+    # 清理工作目錄（檔案 I/O 移至執行緒）與啟動遠端瀏覽器 WebSocket Server 同時進行
+    if IS_WORKER_PROCESS:
+        await _start_remote_server()
+    else:
+        await asyncio.gather(asyncio.to_thread(cleanup_work_directory), _start_remote_server())
 
     yield  # FastAPI 運行中
 
     # 關閉遠端瀏覽器 WebSocket Server
     if REMOTE_BROWSER_ENABLED:
         try:
-            from mcp_server.remote.connection_manager import remote_connection_manager
-
             logger.info("🛑 正在停止遠端瀏覽器 WebSocket Server...")
             await remote_connection_manager.stop_server()
         except Exception as e:
-            logger.exception(f"停止遠端瀏覽器 WebSocket Server 時發生錯誤: {e}")
+            logger.exception("停止遠端瀏覽器 WebSocket Server 時發生錯誤: %s", e)
+
+    # 關閉 Gemini API 非同步連線
+    await get_client().aclose()
+
+    # 寫出背景日誌佇列中剩餘的記錄
+    stop_logging()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -85,32 +189,63 @@ app = FastAPI(
     description="MCP Server with Modular Tool Architecture (v4.0.0)",
     version="4.0.0",
     lifespan=lifespan,
+    default_response_class=MCPJSONResponse,
 )
 
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+app.add_middleware(WildcardCORSMiddleware)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # HTTP 異常處理
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
+# 錯誤回應的固定片段（認證失敗等錯誤可能大量湧入，僅序列化 message/data 等變動部分）
+_HTTP_ERROR_PREFIX_MCP = b'{"jsonrpc":"2.0","id":null,"error":{"code":'
+_HTTP_ERROR_PREFIX_OTHER = b'{"jsonrpc":null,"id":null,"error":{"code":'
+_HTTP_ERROR_UNAUTHORIZED = b'-32000,"message":'
+_HTTP_ERROR_OTHER = b'-32001,"message":'
+_HTTP_ERROR_STATUS = b',"status_code":'
+_MCP_ERROR_MESSAGE = b',"message":'
+_MCP_ERROR_DATA = b',"data":'
+_ERROR_SUFFIX = b"}}"
+
+# 成功回應外框：{"jsonrpc":"2.0","id":...,"result":...}
+_RESULT_PREFIX = b'{"jsonrpc":"2.0","id":'
+_RESULT_BODY = b',"result":'
+_RESULT_SUFFIX = b"}"
+
+
+def _result_response(req_id: int | str | None, result: bytes) -> Response:
+    """將已編碼為 JSON bytes 的 result 直接嵌入 JSON-RPC 回應外框"""
+    return Response(content=b"".join((_RESULT_PREFIX, _dumps(req_id), _RESULT_BODY, result, _RESULT_SUFFIX)), media_type="application/json")
+
+
+def _dumps(value: Any) -> bytes:
+    """以與 MCPJSONResponse 相同的選項序列化單一值"""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """自定義 HTTP 異常處理，確保 MCP 協議格式"""
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
-            "jsonrpc": "2.0" if request.url.path == "/mcp" else None,
-            "id": None,
-            "error": {"code": -32000 if exc.status_code == 401 else -32001, "message": exc.detail, "status_code": exc.status_code},
-        },
+    body = b"".join(
+        (
+            _HTTP_ERROR_PREFIX_MCP if request.scope["path"] == "/mcp" else _HTTP_ERROR_PREFIX_OTHER,
+            _HTTP_ERROR_UNAUTHORIZED if exc.status_code == 401 else _HTTP_ERROR_OTHER,
+            _dumps(exc.detail),
+            _HTTP_ERROR_STATUS,
+            str(exc.status_code).encode(),
+            _ERROR_SUFFIX,
+        )
     )
+    return Response(content=body, status_code=exc.status_code, media_type="application/json")
 
 
 @app.exception_handler(MCPError)
 async def mcp_exception_handler(request: Request, exc: MCPError):
     """處理 MCPError 異常"""
-    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"jsonrpc": "2.0", "id": None, "error": {"code": exc.code, "message": exc.message, "data": exc.data}})
+    body = b"".join((_HTTP_ERROR_PREFIX_MCP, str(exc.code).encode(), _MCP_ERROR_MESSAGE, _dumps(exc.message), _MCP_ERROR_DATA, _dumps(exc.data), _ERROR_SUFFIX))
+    return Response(content=body, status_code=status.HTTP_400_BAD_REQUEST, media_type="application/json")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -119,7 +254,7 @@ async def mcp_exception_handler(request: Request, exc: MCPError):
 
 
 @app.post("/mcp")
-async def mcp_endpoint(req: Request) -> dict:
+async def mcp_endpoint(req: Request) -> Response:
     """
     MCP 協議端點，受 Bearer Token 保護
 
@@ -127,42 +262,42 @@ async def mcp_endpoint(req: Request) -> dict:
     - Tool 處理邏輯已完全移動到 tools/ 目錄
     - 此處僅負責路由與協議層處理
     """
-    await verify_api_key(req)
+    verify_api_key(req)
 
     try:
-        body = await req.json()
-    except Exception:
+        body = _request_decoder.decode(await req.body())
+    except msgspec.ValidationError as e:
+        logger.warning("請求格式錯誤: %s", e)
+        return MCPJSONResponse({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": f"Invalid Request: {e}"}})
+    except msgspec.DecodeError:
         logger.warning("請求 JSON 解析失敗")
-        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error: Invalid JSON"}}
+        return MCPJSONResponse({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error: Invalid JSON"}})
 
-    req_id = body.get("id")
-    method = body.get("method")
+    req_id = body.id
+    method = body.method
 
     try:
-        if method == "initialize":
-            result = _handle_initialize()
-        elif method == "tools/list":
-            result = _handle_tools_list(req)
-        elif method == "tools/call":
-            result = await _handle_tools_call(body, req)
-        else:
+        handler = _SYNC_METHODS.get(method)
+        if handler is not None:
+            return _result_response(req_id, handler(body.params, req))
+        async_handler = _ASYNC_METHODS.get(method)
+        if async_handler is None:
             raise MCPError(-32601, f"Method not found: {method}")
-
-        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+        return _result_response(req_id, await async_handler(body.params, req))
 
     except MCPError as e:
-        return {"jsonrpc": "2.0", "id": req_id, "error": {"code": e.code, "message": e.message, "data": e.data}}
+        return MCPJSONResponse({"jsonrpc": "2.0", "id": req_id, "error": {"code": e.code, "message": e.message, "data": e.data}})
     except ValueError as e:
-        logger.exception(f"參數錯誤: {e}")
-        return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32602, "message": f"Invalid params: {str(e)}"}}
+        logger.exception("參數錯誤: %s", e)
+        return MCPJSONResponse({"jsonrpc": "2.0", "id": req_id, "error": {"code": -32602, "message": f"Invalid params: {str(e)}"}})
     except Exception as e:
-        logger.exception(f"處理請求失敗: {e}")
-        return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32603, "message": f"Internal error: {str(e)}"}}
+        logger.exception("處理請求失敗: %s", e)
+        return MCPJSONResponse({"jsonrpc": "2.0", "id": req_id, "error": {"code": -32603, "message": f"Internal error: {str(e)}"}})
 
 
-def _handle_initialize() -> dict:
-    """處理 initialize method"""
-    return {
+# initialize 回應內容固定，於載入時序列化一次
+_INITIALIZE_RESULT = _dumps(
+    {
         "protocolVersion": "2024-11-05",
         "capabilities": {"tools": {}, "resources": {}, "prompts": {}},
         "serverInfo": {
@@ -172,9 +307,15 @@ def _handle_initialize() -> dict:
             "features": ["python_execution", "package_management", "version_query", "shell_execution"],
         },
     }
+)
 
 
-def _handle_tools_list(request: Request) -> dict:
+def _handle_initialize(params: dict, request: Request) -> bytes:
+    """處理 initialize method"""
+    return _INITIALIZE_RESULT
+
+
+def _handle_tools_list(params: dict, request: Request) -> bytes:
     """
     處理 tools/list method - 從 registry 取得，並根據權限過濾
 
@@ -183,80 +324,120 @@ def _handle_tools_list(request: Request) -> dict:
     - ["web_*"] 表示所有 web_ 開頭的 tools 都允許
 
     Args:
+        params: MCP 請求的 params（未使用）
         request: FastAPI Request 物件，用於取得權限資訊
 
     Returns:
-        dict: 包含允許使用的 tools 清單
+        bytes: 已編碼為 JSON 的 {"tools": [...]}，同一權限鍵在 registry 未變動前重複使用
     """
-    all_tools = registry.list_tools()
-    filtered_tools = filter_allowed_tools(request, all_tools)
-    return {"tools": filtered_tools}
+    global _tools_list_version
+    if _tools_list_version != registry.version:
+        _tools_list_cache.clear()
+        _tools_list_version = registry.version
+
+    permission_key = get_permission_key(request)
+    result = _tools_list_cache.get(permission_key)
+    if result is None:
+        result = _tools_list_cache[permission_key] = _dumps({"tools": filter_allowed_tools(request, registry.list_tools())})
+    return result
+
+
+# tools/list 結果快取：權限鍵 -> 已序列化的結果（registry 版本變動時清空）
+_tools_list_cache: dict[PermissionKey, bytes] = {}
+_tools_list_version = -1
 
 
-async def _handle_tools_call(body: dict, request: Request) -> dict:
+async def _handle_tools_call(params: dict, request: Request) -> bytes:
     """
     處理 tools/call method - 委派給 registry，並檢查權限
 
     Args:
-        body: MCP 請求 body
+        params: MCP 請求的 params
         request: FastAPI Request 物件，用於權限檢查
 
     Returns:
-        dict: 執行結果
+        bytes: 已編碼為 JSON 的執行結果
 
     Raises:
         MCPError: 權限不足或執行失敗
     """
-    import time
-    params = body.get("params", {})
     tool_name = params.get("name")
     args = params.get("arguments", {})
+    if not isinstance(tool_name, str):
+        raise MCPError(-32602, "Invalid params: 'name' must be a string", data={"tool": tool_name})
 
     # 檢查該 API Key 是否有權限執行此 tool
     if not is_tool_allowed(request, tool_name):
-        logger.warning(f"Tool '{tool_name}' 權限不足")
+        logger.warning("Tool '%s' 權限不足", tool_name)
         raise MCPError(code=-32603, message=f"Permission denied: Tool '{tool_name}' is not allowed for this API Key", data={"tool": tool_name})
 
     start_time = time.perf_counter()
-    logger.info(f"⏳ [Tool Start] {tool_name} | Args: {str(args)[:200]}{'...' if len(str(args)) > 200 else ''}")
+    if logger.isEnabledFor(logging.INFO):
+        args_text = str(args)
+        logger.info("⏳ [Tool Start] %s | Args: %s%s", tool_name, args_text[:200], "..." if len(args_text) > 200 else "")
 
     try:
         exec_result = await registry.execute(tool_name, args, request)
         duration = time.perf_counter() - start_time
-        result = format_tool_result(exec_result)
+        result = encode_tool_result(exec_result)
 
         # 記錄回覆摘要
         status_icon = "✅" if exec_result.success else "❌"
-        logger.info(f"{status_icon} [Tool End] {tool_name} | Duration: {duration:.3f}s")
+        logger.info("%s [Tool End] %s | Duration: %.3fs", status_icon, tool_name, duration)
         return result
     except Exception as e:
         duration = time.perf_counter() - start_time
-        logger.error(f"🔥 [Tool Error] {tool_name} | Duration: {duration:.3f}s | Error: {str(e)}")
+        logger.error("🔥 [Tool Error] %s | Duration: %.3fs | Error: %s", tool_name, duration, e)
         raise e
 
 
+# method 分派表：同步 handler 直接呼叫，僅 tools/call 需要 await
+_SYNC_METHODS: dict[str, Callable[[dict, Request], bytes]] = {
+    "initialize": _handle_initialize,
+    "tools/list": _handle_tools_list,
+}
+_ASYNC_METHODS: dict[str, Callable[[dict, Request], Awaitable[bytes]]] = {
+    "tools/call": _handle_tools_call,
+}
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 健康檢查端點
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
 @app.get("/mcp")
-async def mcp_get(req: Request) -> dict:
+async def mcp_get(req: Request) -> MCPJSONResponse:
     """健康檢查端點，受 Bearer Token 保護。"""
-    await verify_api_key(req)
+    verify_api_key(req)
 
-    # 取得 Python 版本資訊
-    import platform
+    return MCPJSONResponse({**_health_base(), "tools_loaded": registry.get_tool_count(), "stats": {"temp_python_files": _count_temp_python_files()}})
 
-    version_info = {
-        "version": platform.python_version(),
-        "implementation": platform.python_implementation(),
-        "platform": platform.platform(),
-        "architecture": platform.machine(),
-    }
 
-    py_files = len(list(WORK_DIR.glob("exec_*.py"))) if WORK_DIR.exists() else 0
+# 暫存 Python 檔案數量快取：(計算時間, 數量)，頻繁的健康檢查不必每次掃描目錄
+_TEMP_FILE_COUNT_TTL = 5.0
+_temp_file_count: tuple[float, int] = (float("-inf"), 0)
+
 
+def _count_temp_python_files() -> int:
+    """計算工作目錄中的 exec_*.py 數量（快取 5 秒）"""
+    global _temp_file_count
+    now = time.monotonic()
+    if now - _temp_file_count[0] < _TEMP_FILE_COUNT_TTL:
+        return _temp_file_count[1]
+
+    try:
+        with os.scandir(WORK_DIR) as entries:
+            count = sum(1 for entry in entries if entry.name.startswith("exec_") and entry.name.endswith(".py"))
+    except FileNotFoundError:
+        count = 0
+    _temp_file_count = (now, count)
+    return count
+
+
+@functools.cache
+def _health_base() -> dict[str, Any]:
+    """健康檢查回應中不隨請求變動的部分（首次呼叫時建立，之後共用；僅供序列化，請勿修改）"""
     return {
         "status": "ok",
         "authenticated": True,
@@ -264,15 +445,18 @@ async def mcp_get(req: Request) -> dict:
         "version": "4.0.0",
         "architecture": "modular",
         "features": ["python_execution", "package_management", "version_query", "shell_execution"],
-        "tools_loaded": registry.get_tool_count(),
         "security": {
             "api_key_required": bool(API_KEYS),
             "api_keys_count": len(API_KEYS) if API_KEYS else 0,
             "auth_method": "Authorization: Bearer <token>" if API_KEYS else "None (Development Mode)",
         },
-        "python": version_info,
+        "python": {
+            "version": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "architecture": platform.machine(),
+        },
         "config": {"work_directory": str(WORK_DIR.absolute()), "python_timeout": MAX_EXECUTION_TIME, "max_output_length": 100000},
-        "stats": {"temp_python_files": py_files},
     }
 
 
@@ -281,9 +465,19 @@ async def mcp_get(req: Request) -> dict:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
-    import uvicorn
+    import sys
 
-    logger.info(f"🔧 已載入 {registry.get_tool_count()} 個 Tools")
-    logger.info(f"📂 預計工作目錄: {WORK_DIR.absolute()}")
+    import uvicorn
 
-    uvicorn.run(app, host=MCP_HOST, port=MCP_PORT)
+    logger.info("🔧 已載入 %d 個 Tools", registry.get_tool_count())
+    logger.info("📂 預計工作目錄: %s", WORK_DIR.absolute())
+
+    uvicorn.run(
+        app,
+        host=MCP_HOST,
+        port=MCP_PORT,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        backlog=4096,
+        timeout_keep_alive=30,
+    )
@@ -6,9 +6,12 @@
 
 import os
 import re
+from dataclasses import dataclass, field, is_dataclass
 from enum import Enum
 from typing import Any
 
+import msgspec
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MIME 類型映射
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -55,6 +58,14 @@ ALLOWED_EXTENSIONS = {
     ".m4a": "audio/mp4",
 }
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# M3U8 解析
+# ═══════════════════════════════════════════════════════════════════════════════
+_STREAM_INF_PREFIX = "#EXT-X-STREAM-INF:"
+_STREAM_INFO_RE = re.compile(r'(\w+)=("[^"]+"|[^,]+)')
+# 一次比對出「串流資訊 + 緊接的下一行 URL」
+_STREAM_ENTRY_RE = re.compile(rf"^{_STREAM_INF_PREFIX}([^\r\n]*)\r?\n(https://\S+)", re.MULTILINE)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 列舉類別
@@ -70,6 +81,7 @@ class ChatError(Enum):
 # ═══════════════════════════════════════════════════════════════════════════════
 # 資料類別
 # ═══════════════════════════════════════════════════════════════════════════════
+@dataclass(slots=True)
 class AIConfig:
     """AI 模型配置類別。
 
@@ -82,85 +94,69 @@ class AIConfig:
         api_key: API 金鑰。
     """
 
-    def __init__(self, params_dict: dict[str, Any]) -> None:
-        self.provider: str = params_dict.get("provider", "gemini")
-        self.model_name: str = params_dict.get("model_name", "gemini-3-flash-preview")
-        self.temperature: float = params_dict.get("temperature", 1.0)
-        self.top_k: int = params_dict.get("top_k", 100)
-        self.top_p: float = params_dict.get("top_p", 0.9)
-        self.api_key: str = params_dict.get("api_key", "")
-
-    def __repr__(self) -> str:
-        return str(self.__dict__)
-
-    def __str__(self) -> str:
-        return str(self.__dict__)
+    provider: str = "gemini"
+    model_name: str = "gemini-3-flash-preview"
+    temperature: float = 1.0
+    top_k: int = 100
+    top_p: float = 0.9
+    api_key: str = ""
 
 
+@dataclass(slots=True)
 class AudioProcParams:
     """音訊處理參數類別。"""
 
-    def __init__(self, params_dict: dict[str, Any]) -> None:
-        # 測量值
-        self.measured_i: float = params_dict.get("measured_i", 0)
-        self.measured_tp: float = params_dict.get("measured_tp", 0)
-        self.measured_lra: float = params_dict.get("measured_lra", 0)
-        self.measured_thresh: float = params_dict.get("measured_thresh", 0)
-        self.offset: float = params_dict.get("offset", 0)
+    # 測量值
+    measured_i: float = 0
+    measured_tp: float = 0
+    measured_lra: float = 0
+    measured_thresh: float = 0
+    offset: float = 0
 
-        # 目標值
-        self.integrated_loudness: float = params_dict.get("integrated_loudness", -16)
-        self.true_peak: float = params_dict.get("true_peak", -1.5)
-        self.loudness_range: float = params_dict.get("loudness_range", 7)
+    # 目標值
+    integrated_loudness: float = -16
+    true_peak: float = -1.5
+    loudness_range: float = 7
 
-    def __repr__(self) -> str:
-        return str(self.__dict__)
 
+class FileProcParams(msgspec.Struct):
+    """檔案處理參數類別。
+
+    file_name 由 src_path 推得；指定 work_folder 時 work_path 會指向其中的同名檔案。
+    """
 
-class FileProcParams:
-    """檔案處理參數類別。"""
+    src_path: str = ""
+    work_path: str = ""
+    work_folder: str = ""
+    file_name: str = ""
 
-    def __init__(self, _dict: dict[str, Any]) -> None:
-        self.src_path: str = ""
-        self.work_path: str = ""
-        self.work_folder: str = ""
-        self.__dict__.update(_dict)
+    def __post_init__(self) -> None:
         self.file_name = os.path.basename(self.src_path)
         if self.work_folder and self.src_path:
             self.work_path = os.path.join(self.work_folder, self.file_name)
 
-    def __repr__(self) -> str:
-        return str(self.__dict__)
-
 
+@dataclass(slots=True)
 class FFmpegCodecArgs:
     """FFmpeg 編解碼器參數類別。"""
 
-    def __init__(self, _dict: dict[str, Any]) -> None:
-        self.encoder: str = _dict.get("encoder", "libx265")
-        self.scale: bool = _dict.get("scale", False)
-        self.fps: bool = _dict.get("fps", False)
-        self.transpose: int = _dict.get("transpose", 0)
-        self.timeout: bool = _dict.get("timeout", False)
-        self.duration: int = _dict.get("duration", 0)
-        self.force_comment: bool = _dict.get("force_comment", False)
-        self.vf: list[str] = _dict.get("vf", [])
+    encoder: str = "libx265"
+    scale: bool = False
+    fps: bool = False
+    transpose: int = 0
+    timeout: bool = False
+    duration: int = 0
+    force_comment: bool = False
+    vf: list[str] = field(default_factory=list)
 
 
 class HLSPlaylist:
     """解析 M3U8 播放列表結構的類別。"""
 
     def __init__(self, playlist_content: str) -> None:
-        stream_list = []
-        current_stream_info: dict[str, str] = {}
-        for line in playlist_content.splitlines():
-            if line.startswith("#EXT-X-STREAM-INF:"):
-                current_stream_info = parse_stream_info(line.replace("#EXT-X-STREAM-INF:", ""))
-            elif line.startswith("https://"):
-                current_stream_info["url"] = line
-                stream_list.append(current_stream_info)
-                current_stream_info = {}
-        self.playlists = [self.StreamInfo(info) for info in stream_list]
+        self.playlists = [
+            self.StreamInfo({**parse_stream_info(match[1]), "url": match[2]}) for match in _STREAM_ENTRY_RE.finditer(playlist_content)
+        ]
 
     def __repr__(self) -> str:
         return str(self.__dict__)
@@ -179,18 +175,21 @@ class HLSPlaylist:
             return str(self.__dict__)
 
 
-class VideoDownloadArgs:
+class VideoDownloadArgs(msgspec.Struct):
     """視訊下載參數類別。"""
 
-    def __init__(self, _dict: dict[str, Any]) -> None:
-        self.uid: str = _dict.get("uid", "")
-        self.url: str = _dict.get("url", "")
-        self.dst: str = _dict.get("dst", "")
-        self.work_folder: str = _dict.get("work_folder", "")
-        self.proc_way: str = _dict.get("proc_way", "m3u8")
-        self.duration: int = int(_dict.get("duration", 0))
-        self.min_size: int = _dict.get("min_size", 100)
-        self.stream_name: str = _dict.get("stream_name", "")
+    uid: str = ""
+    url: str = ""
+    dst: str = ""
+    work_folder: str = ""
+    proc_way: str = "m3u8"
+    duration: int = 0
+    min_size: int = 100
+    stream_name: str = ""
+
+    def __post_init__(self) -> None:
+        # duration 可能來自字串形式的參數
+        self.duration = int(self.duration)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -198,16 +197,11 @@ class VideoDownloadArgs:
 # ═══════════════════════════════════════════════════════════════════════════════
 def obj_to_dict(obj: object) -> dict[str, Any] | object:
     """將物件轉換為字典。"""
-    if hasattr(obj, "__dict__"):
-        return obj.__dict__
-    return obj
+    if isinstance(obj, msgspec.Struct) or is_dataclass(obj):
+        return msgspec.to_builtins(obj)
+    return getattr(obj, "__dict__", obj)
 
 
 def parse_stream_info(info_str: str) -> dict[str, str]:
     """解析串流資訊字串。"""
-    info_dict: dict[str, str] = {}
-    for match in re.findall(r'(\w+)=("[^"]+"|[^,]+)', info_str):
-        key, value = match
-        value = value.strip('"')
-        info_dict[key.lower()] = value
-    return info_dict
+    return {key.lower(): value.strip('"') for key, value in _STREAM_INFO_RE.findall(info_str)}
@@ -4,11 +4,15 @@
 提供統一的日誌系統配置，支援控制台顏色輸出和檔案輪替。
 """
 
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+import orjson
+
 # 預設外部套件日誌等級
 EXTERNAL_LOG = [
     "yfinance",
@@ -30,34 +34,25 @@ EXTERNAL_LOG = [
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
-def _get_color_formatter_func(fg: int | None = None, bg: int | None = None):
-    """根據前景或背景顏色代碼，返回用於文字著色的函式。"""
+def _color_prefix(fg: int | None = None, bg: int | None = None) -> str:
+    """根據前景或背景顏色代碼，返回 ANSI 顏色前綴。"""
     color_codes = []
     if fg is not None:
         color_codes.append(f"38;5;{fg}")
     if bg is not None:
         color_codes.append(f"48;5;{bg}")
+    return f"\033[{';'.join(color_codes)}m"
 
-    if not color_codes:
-        return lambda text: text
-
-    color_prefix = f"\033[{';'.join(color_codes)}m"
-    reset_code = "\033[0m"
-
-    def apply_color(text: str) -> str:
-        return f"{color_prefix}{text}{reset_code}"
-
-    return apply_color
 
-
-# 不同日誌等級的顏色映射
-_LEVEL_COLORS = {
-    logging.DEBUG: _get_color_formatter_func(fg=7),  # 白色
-    logging.INFO: _get_color_formatter_func(fg=2),  # 綠色
-    logging.WARNING: _get_color_formatter_func(fg=3),  # 黃色
-    logging.ERROR: _get_color_formatter_func(fg=1),  # 紅色
-    logging.CRITICAL: _get_color_formatter_func(fg=6, bg=1),
+# 不同日誌等級的顏色前綴（載入時預先組好，格式化時僅做字串串接）
+_LEVEL_PREFIX = {
+    logging.DEBUG: _color_prefix(fg=7),  # 白色
+    logging.INFO: _color_prefix(fg=2),  # 綠色
+    logging.WARNING: _color_prefix(fg=3),  # 黃色
+    logging.ERROR: _color_prefix(fg=1),  # 紅色
+    logging.CRITICAL: _color_prefix(fg=6, bg=1),
 }
+_RESET = "\033[0m"
 
 
 class ColoredFormatter(logging.Formatter):
@@ -65,7 +60,73 @@ class ColoredFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         message = super().format(record)
-        return _LEVEL_COLORS.get(record.levelno, lambda x: x)(message)
+        prefix = _LEVEL_PREFIX.get(record.levelno)
+        return message if prefix is None else prefix + message + _RESET
+
+
+class JSONFormatter(logging.Formatter):
+    """JSON Lines 日誌格式化器，每筆記錄以 orjson 一次序列化為單行 JSON（供檔案輸出）。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "lvl": record.levelname,
+            "name": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            # 與 logging.Formatter 相同，快取於 exc_text 供其他 handler 重用
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        # 換行由 handler 的 terminator 負責，不使用 OPT_APPEND_NEWLINE
+        return orjson.dumps(entry).decode()
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    僅在同一 process 內傳遞記錄的 QueueHandler
+
+    呼叫端只合併 msg 與 args（避免參數在背景格式化前被修改），
+    其餘格式化（含例外堆疊）交由 QueueListener 的背景執行緒處理。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# 目前運作中的背景日誌執行緒（setup_logging 重複呼叫時會先停止舊的）
+_listener: QueueListener | None = None
+
+
+def stop_logging() -> None:
+    """
+    停止背景日誌執行緒並寫出佇列中剩餘的記錄。
+
+    之後的記錄改由原本的 handler 在呼叫端同步輸出，不會遺失。
+    """
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, _LocalQueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        root_logger.addHandler(handler)
+
+
+atexit.register(stop_logging)
 
 
 def setup_logging(
@@ -77,20 +138,33 @@ def setup_logging(
     """
     設定應用的全局日誌系統。
 
+    root logger 只掛一個 QueueHandler，檔案與控制台的格式化及 I/O 都在背景執行緒進行，
+    不會阻塞事件迴圈。
+
     Args:
-        log_file: 日誌檔案名稱（相對於 log_dir）。
+        log_file: 日誌檔案名稱（相對於 log_dir），內容為 JSON Lines。
         console_log_level: 控制台輸出的日誌等級。
         file_log_level: 檔案輸出的日誌等級。
         log_dir: 日誌目錄路徑，預設為專案根目錄的 logs/。
     """
+    global _listener
+
+    # 日誌格式未使用 thread / process 資訊，略過每筆記錄的查詢
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
 
     # 清除現有的 handler
+    stop_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
         handler.close()
 
+    handlers: list[logging.Handler] = []
+
     # 1. 檔案處理器
     if file_log_level != logging.NOTSET:
         # 確定日誌目錄
@@ -112,12 +186,8 @@ def setup_logging(
                 encoding="utf-8",
             )
             file_handler.setLevel(file_log_level)
-            file_formatter = logging.Formatter(
-                fmt="[%(asctime)s][%(levelname)-8s][%(name)s:%(module)s:%(lineno)d] %(message)s",
-                datefmt=DATE_FORMAT,
-            )
-            file_handler.setFormatter(file_formatter)
-            root_logger.addHandler(file_handler)
+            file_handler.setFormatter(JSONFormatter())
+            handlers.append(file_handler)
         except OSError as e:
             sys.stderr.write(f"警告: 無法建立日誌檔案處理器: {e}\n")
 
@@ -137,7 +207,15 @@ def setup_logging(
                 datefmt=DATE_FORMAT,
             )
         console_handler.setFormatter(console_formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    # 3. 佇列處理器：低於所有 handler 等級的記錄不入列
+    if handlers:
+        queue_handler = _LocalQueueHandler(queue.SimpleQueue())
+        queue_handler.setLevel(min(handler.level for handler in handlers))
+        root_logger.addHandler(queue_handler)
+        _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
 
     # 設定外部套件日誌等級
     for log_name in EXTERNAL_LOG:
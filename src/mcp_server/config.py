@@ -4,14 +4,17 @@
 集中管理所有配置項，從環境變數載入。
 """
 
-import json
+import base64
+import functools
 import logging
 import os
+import re
 import sys
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, ClassVar
 
-from dotenv import load_dotenv
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -19,18 +22,33 @@ logger = logging.getLogger(__name__)
 # 基本設定
 # ═══════════════════════════════════════════════════════════════════════════════
 # 專案根目錄
-PROJECT_ROOT = Path(__file__).parent.parent.parent
+PROJECT_ROOT = Path(__file__).parents[2]
 
-# 載入 .env 檔案
 ENV_PATH = PROJECT_ROOT / ".env"
-if ENV_PATH.exists():
-    load_dotenv(ENV_PATH)
-    logger.info(f"📁 已載入環境設定檔: {ENV_PATH}")
 
-# 將專案根目錄加入 sys.path，以便載入 natekit 等模組
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-    logger.info(f"📁 已將專案根目錄加入 sys.path: {PROJECT_ROOT}")
+# 已載入 .env 的標記；子 process（如 uvicorn worker）會繼承環境變數與此標記，不必重新解析
+_ENV_LOADED_MARKER = "_MCP_SERVER_ENV_LOADED"
+
+
+def _bootstrap_env() -> None:
+    """載入 .env 並將專案根目錄加入 sys.path（重複呼叫或 reload 時不重做）"""
+    if os.environ.get(_ENV_LOADED_MARKER) != "1":
+        # 僅首次載入時才需要 dotenv
+        from dotenv import load_dotenv
+
+        os.environ[_ENV_LOADED_MARKER] = "1"
+        # 不覆寫已存在的環境變數
+        if load_dotenv(ENV_PATH, override=False):
+            logger.info(f"📁 已載入環境設定檔: {ENV_PATH}")
+
+    # 將專案根目錄加入 sys.path，以便載入 natekit 等模組
+    project_root = str(PROJECT_ROOT)
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+        logger.info(f"📁 已將專案根目錄加入 sys.path: {PROJECT_ROOT}")
+
+
+_bootstrap_env()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 認證設定 - 多 API Key 權限管理
@@ -48,37 +66,64 @@ if str(PROJECT_ROOT) not in sys.path:
 # 設定方式：請在 .env 中設定 MCP_API_KEYS (Base64 編碼的 JSON 陣列)
 
 
+# JSON 環境變數解析快取：變數名稱 -> (原始字串, 解析結果)；原始字串變動時才重新解析
+_JSON_ENV_CACHE: dict[str, tuple[str, Any]] = {}
+
+
+def _reset_json_env_cache() -> None:
+    """清除 JSON 環境變數解析快取與 APIKeyManager 的結果快取（供測試使用）"""
+    _JSON_ENV_CACHE.clear()
+    APIKeyManager._cache.clear()
+
+
 class APIKeyManager:
     """API Keys 管理類別"""
 
+    # 整理後的結果快取：名稱 -> (原始環境變數字串, 結果)；環境變數未變動時直接回傳
+    _cache: ClassVar[dict[str, tuple[str, Any]]] = {}
+
     @staticmethod
     def _load_json_env(key: str, default: Any = None) -> Any:
-        """從環境變數載入 JSON 格式的值"""
-        import base64
-
+        """從環境變數載入 JSON 格式的值（同一字串只解析一次，呼叫端請勿修改回傳值）"""
         value = os.getenv(key, "")
         if not value:
             return default
+
+        cached = _JSON_ENV_CACHE.get(key)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+
         try:
-            return json.loads(value)
-        except json.JSONDecodeError:
+            result = orjson.loads(value)
+        except orjson.JSONDecodeError:
             try:
-                return json.loads(base64.b64decode(value).decode("utf-8"))
+                result = orjson.loads(base64.b64decode(value))
             except Exception:
                 return default
+        _JSON_ENV_CACHE[key] = (value, result)
+        return result
 
     @classmethod
-    def get_api_keys(cls) -> dict[str, dict]:
-        """取得 MCP API Keys"""
-        raw = cls._load_json_env("MCP_API_KEYS", [])
-        if not raw:
-            return {}
-        return {item["api_key"]: {k: v for k, v in item.items() if k != "api_key"} for item in raw}
+    def get_api_keys(cls) -> MappingProxyType[str, dict]:
+        """取得 MCP API Keys（唯讀對應，環境變數未變動時重複使用同一物件）"""
+        env_value = os.getenv("MCP_API_KEYS", "")
+        cached = cls._cache.get("api_keys")
+        if cached is not None and cached[0] == env_value:
+            return cached[1]
+
+        api_keys: dict[str, dict] = {}
+        for item in cls._load_json_env("MCP_API_KEYS", []):
+            # dict() 以 C 層級複製整張表，再移除 api_key 本身
+            key_config = dict(item)
+            api_keys[key_config.pop("api_key")] = key_config
+        result = MappingProxyType(api_keys)
+        cls._cache["api_keys"] = (env_value, result)
+        return result
 
     @classmethod
     def get_gemini_keys(cls) -> list[dict]:
-        """取得 Gemini API Keys"""
-        return cls._load_json_env("GEMINI_API_KEYS", [])
+        """取得 Gemini API Keys（回傳淺拷貝，呼叫端可自由增減）"""
+        return list(cls._load_json_env("GEMINI_API_KEYS", []))
 
     @classmethod
     def get_deepseek_key(cls) -> str:
@@ -111,32 +156,37 @@ if _raw_work_dir.startswith("./"):
 else:
     WORK_DIR = Path(_raw_work_dir).resolve()
 
-WORK_DIR.mkdir(parents=True, exist_ok=True)
-
 # Shell 預設執行目錄
 DEFAULT_SHELL_CWD = Path(os.getenv("MCP_SHELL_CWD", "."))
 
 
+@functools.cache
+def ensure_work_dir() -> Path:
+    """建立工作目錄並回傳其路徑（每個 process 僅在首次需要寫入時執行一次 mkdir）"""
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    return WORK_DIR
+
+
 def cleanup_work_directory() -> None:
     """清理工作目錄中的所有檔案"""
     import shutil
 
-    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    # 伺服器啟動時必定執行，之後目錄必定存在，健康檢查等處不需再以 exists() 確認
+    ensure_work_dir()
 
-    if WORK_DIR.exists():
-        cleaned_count = 0
-        for item in WORK_DIR.iterdir():
-            try:
-                if item.is_file():
-                    item.unlink()
-                    cleaned_count += 1
-                elif item.is_dir():
-                    shutil.rmtree(item)
-                    cleaned_count += 1
-            except Exception as e:
-                logger.warning(f"無法清理 {item}: {e}")
-        if cleaned_count > 0:
-            logger.info(f"🧹 已清理工作目錄: 移除 {cleaned_count} 個項目")
+    cleaned_count = 0
+    for item in WORK_DIR.iterdir():
+        try:
+            if item.is_file():
+                item.unlink()
+                cleaned_count += 1
+            elif item.is_dir():
+                shutil.rmtree(item)
+                cleaned_count += 1
+        except Exception as e:
+            logger.warning(f"無法清理 {item}: {e}")
+    if cleaned_count > 0:
+        logger.info(f"🧹 已清理工作目錄: 移除 {cleaned_count} 個項目")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -144,6 +194,11 @@ def cleanup_work_directory() -> None:
 # ═══════════════════════════════════════════════════════════════════════════════
 MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")
 MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+# uvicorn worker process 數；遠端瀏覽器連線只存在於單一 process，啟用時固定為 1
+MCP_WORKERS = max(1, int(os.getenv("MCP_WORKERS", "1")))
+# __main__ 以多個 worker 啟動前設定此環境變數；worker process 繼承後據此略過只應在主 process 執行一次的工作
+MULTI_WORKER_ENV = "_MCP_SERVER_MULTI_WORKER"
+IS_WORKER_PROCESS = os.getenv(MULTI_WORKER_ENV) == "1"
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 執行限制
@@ -157,6 +212,8 @@ MAX_OUTPUT_LENGTH = int(os.getenv("MCP_MAX_OUTPUT", "1000000"))
 # ═══════════════════════════════════════════════════════════════════════════════
 DANGEROUS_SHELL_PATTERNS: list[str] = []
 DANGEROUS_PACKAGE_CHARS = [";", "|", "&", "$", "`", "||", "&&", "<", ">"]
+# 拆成單一字元的集合（多字元項目如 "||" 已由其字元涵蓋），以 isdisjoint 一次檢查
+DANGEROUS_PACKAGE_CHAR_SET = frozenset("".join(DANGEROUS_PACKAGE_CHARS))
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # TMDB 設定
@@ -202,6 +259,8 @@ DANGEROUS_SQL_PATTERNS = [
     "mysql.user",  # 禁止存取使用者表
     "sys.",  # 系統資料庫
 ]
+# 所有危險模式合併為單一不分大小寫的 regex，一次掃描完成比對
+DANGEROUS_SQL_RE = re.compile("|".join(re.escape(pattern) for pattern in DANGEROUS_SQL_PATTERNS), re.IGNORECASE)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Gmail 多帳號設定
@@ -215,6 +274,9 @@ def load_gmail_accounts() -> dict[str, dict[str, str]]:
     環境變數格式 (JSON):
         GMAIL_ACCOUNTS={"alice@gmail.com":{"client_id":"xxx","client_secret":"xxx","refresh_token":"xxx"},"bob@gmail.com":{...}}
 
+    同一字串只解析一次，回傳的字典為共用物件，請勿修改；
+    測試時可呼叫 load_gmail_accounts.cache_clear() 重設。
+
     Returns:
         dict: Gmail 帳號配置，key 為 email，value 包含 client_id, client_secret, refresh_token
     """
@@ -222,9 +284,14 @@ def load_gmail_accounts() -> dict[str, dict[str, str]]:
     if not raw:
         logger.debug("未設定 GMAIL_ACCOUNTS 環境變數")
         return {}
+    return _parse_gmail_accounts(raw)
 
+
+@functools.lru_cache(maxsize=1)
+def _parse_gmail_accounts(raw: str) -> dict[str, dict[str, str]]:
+    """解析 GMAIL_ACCOUNTS 字串並補上預設的 token_uri"""
     try:
-        accounts = json.loads(raw)
+        accounts = orjson.loads(raw)
         if not isinstance(accounts, dict):
             logger.warning("GMAIL_ACCOUNTS 格式錯誤：必須是 JSON 物件")
             return {}
@@ -238,7 +305,7 @@ def load_gmail_accounts() -> dict[str, dict[str, str]]:
         if accounts:
             logger.info(f"📧 已載入 {len(accounts)} 個 Gmail 帳號設定")
         return accounts
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.exception("GMAIL_ACCOUNTS JSON 解析失敗")
         return {}
     except Exception:
@@ -246,6 +313,9 @@ def load_gmail_accounts() -> dict[str, dict[str, str]]:
         return {}
 
 
+load_gmail_accounts.cache_clear = _parse_gmail_accounts.cache_clear  # type: ignore[attr-defined]
+
+
 # Gmail 帳號配置（全域）
 GMAIL_ACCOUNTS: dict[str, dict[str, str]] = load_gmail_accounts()
 
@@ -293,7 +363,7 @@ GEMINI_PROXY_URL = os.getenv("GEMINI_PROXY_URL", "")
 OLLAMA_PROXY_URL = os.getenv("OLLAMA_PROXY_URL", "")
 GEMINI_API_VERSION = "v1beta"
 
-GEMINI_MODEL_LIST = [
+GEMINI_MODEL_LIST = (
     "models/gemini-3-flash-preview",
     "models/gemini-3-pro-preview",
     "models/gemini-2.5-flash-lite",
@@ -301,11 +371,12 @@ GEMINI_MODEL_LIST = [
     "models/gemini-2.5-pro",
     "models/gemini-2.5-pro-preview-03-25",
     "models/gemini-2.5-flash-image-preview",
-]
+)
 
-GEMINI_SAFETY_SETTINGS = [
+# 以 tuple 保存，可直接放入每次請求的 payload 共用（各項維持 dict，orjson 不支援序列化 MappingProxyType）
+GEMINI_SAFETY_SETTINGS = (
     {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
     {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
     {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-]
+)
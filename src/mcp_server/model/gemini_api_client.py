@@ -4,21 +4,46 @@ Gemini API 用戶端模組
 提供 Gemini 和 Ollama API 的統一介面。
 """
 
+import asyncio
 import base64
-import json
+import binascii
+import importlib.util
 import logging
 import mimetypes
+import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-import requests
+import orjson
 
-from mcp_server.base.data_structures import AIConfig
+from mcp_server.base.data_structures import IMG_MIME_TYPES, AIConfig
+from mcp_server.config import GEMINI_SAFETY_SETTINGS
 
 logger = logging.getLogger(__name__)
 
 
+# 同步（requests）與非同步（httpx）請求共用的重試與連線池設定
+_RETRY_TOTAL = 2
+_RETRY_BACKOFF = 0.5
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+_POOL_MAXSIZE = 16
+
+
+def _retry_delay(response: Any, attempt: int) -> float:
+    """依 Retry-After 標頭（秒數）決定重試前的等待時間，未提供時以指數退避"""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return _RETRY_BACKOFF * (2**attempt)
+
+
+def _dumps_indented(value: Any) -> str:
+    """將 API 回應格式化為縮排 JSON 字串（錯誤訊息用）"""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+
+
 class GeminiAPIClient:
     """Gemini API 用戶端"""
 
@@ -30,12 +55,16 @@ class GeminiAPIClient:
         Args:
             api_keys: Gemini API Keys 列表，格式為 [{"key": "xxx", "mail": "yyy"}, ...]
         """
-        self._api_keys = api_keys or []
+        self._api_keys: list[dict] = []
+        self._api_key_count = 0
         self._current_key_index = 0
+        self.set_api_keys(api_keys or [])
         self._pay_key = ""
         self._api_base_url = ""
         self._proxy_url = ""
         self._ollama_proxy_url = ""
+        self._session: Any = None
+        self._async_client: Any = None
 
     def configure(
         self,
@@ -50,17 +79,64 @@ class GeminiAPIClient:
         self._proxy_url = proxy_url
         self._ollama_proxy_url = ollama_proxy_url
 
+    def set_api_keys(self, api_keys: list[dict]) -> None:
+        """設定 API Keys，並重設輪換位置（索引始終保持在 Key 數量範圍內）"""
+        self._api_keys = api_keys
+        self._api_key_count = len(api_keys)
+        self._current_key_index = 0
+
     def _get_api_key(self) -> str:
         """取得目前的 API Key"""
-        if self._api_keys:
-            idx = self._current_key_index % len(self._api_keys)
-            return self._api_keys[idx].get("key", "")
+        if self._api_key_count:
+            return self._api_keys[self._current_key_index].get("key", "")
         return ""
 
+    def _get_session(self) -> Any:
+        """取得共用的 requests.Session（首次呼叫時建立），以 keep-alive 重用 TLS 連線"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # 429 / 5xx 依 Retry-After 或指數退避重試，最後一次的回應仍交由 raise_for_status 判斷
+            retry = Retry(
+                total=_RETRY_TOTAL,
+                backoff_factor=_RETRY_BACKOFF,
+                status_forcelist=_RETRY_STATUS,
+                allowed_methods=frozenset({"GET", "POST"}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_POOL_MAXSIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    def _get_async_client(self) -> Any:
+        """取得共用的 httpx.AsyncClient（首次呼叫時建立），供非同步請求共用連線"""
+        if self._async_client is None:
+            import httpx
+
+            # 安裝 h2 時啟用 HTTP/2，多個並行請求可共用同一條 TLS 連線
+            # 連線池上限與 requests Session 相同；transport 的 retries 僅重試連線失敗，429 / 5xx 由 agenerate_content 處理
+            transport = httpx.AsyncHTTPTransport(
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=_POOL_MAXSIZE, max_keepalive_connections=_POOL_MAXSIZE),
+                retries=_RETRY_TOTAL,
+            )
+            self._async_client = httpx.AsyncClient(timeout=60, transport=transport)
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """關閉非同步 HTTP 用戶端"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     def _rotate_key(self) -> None:
         """輪換 API Key"""
-        if len(self._api_keys) > 1:
-            self._current_key_index = (self._current_key_index + 1) % len(self._api_keys)
+        self._current_key_index = (self._current_key_index + 1) % max(self._api_key_count, 1)
 
     def generate_content(
         self,
@@ -69,6 +145,54 @@ class GeminiAPIClient:
         is_pay: bool = False,
     ) -> dict[str, Any]:
         """發送生成內容請求"""
+        url, headers = self._build_request(ai_config, is_pay)
+
+        # requests 載入成本高，僅在實際發送請求時匯入
+        import requests
+
+        try:
+            # 請求內容可能包含數 MB 的 base64 圖片，以 orjson 序列化與解析
+            response = self._get_session().post(url, headers=headers, data=orjson.dumps(chat_data), timeout=60)
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except requests.exceptions.RequestException:
+            logger.exception("API 請求失敗")
+            return {}
+        except Exception:
+            logger.exception("發送 API 請求時發生未知錯誤")
+            return {}
+
+    async def agenerate_content(
+        self,
+        ai_config: AIConfig,
+        chat_data: dict[str, Any],
+        is_pay: bool = False,
+    ) -> dict[str, Any]:
+        """發送生成內容請求（非同步版本，等待回應期間不佔用執行緒）"""
+        url, headers = self._build_request(ai_config, is_pay)
+
+        import httpx
+
+        try:
+            client = self._get_async_client()
+            content = orjson.dumps(chat_data)
+            # 429 / 5xx 依 Retry-After 或指數退避重試（與同步版本的 Retry 設定相同），最後一次的回應交由 raise_for_status 判斷
+            for attempt in range(_RETRY_TOTAL + 1):
+                response = await client.post(url, headers=headers, content=content)
+                if response.status_code not in _RETRY_STATUS or attempt == _RETRY_TOTAL:
+                    break
+                await asyncio.sleep(_retry_delay(response, attempt))
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except httpx.HTTPError:
+            logger.exception("API 請求失敗")
+            return {}
+        except Exception:
+            logger.exception("發送 API 請求時發生未知錯誤")
+            return {}
+
+    def _build_request(self, ai_config: AIConfig, is_pay: bool) -> tuple[str, dict[str, str]]:
+        """依供應商與付費設定組出請求 URL 與標頭"""
         model_name = ai_config.model_name
         headers = {"Content-Type": "application/json"}
 
@@ -88,20 +212,11 @@ class GeminiAPIClient:
                     url = f"{self._api_base_url}/{self.DEFAULT_API_VERSION}/models/{model_name}:generateContent"
                     headers["X-goog-api-key"] = api_key
 
-        try:
-            with requests.Session() as session:
-                response = session.post(url, headers=headers, json=chat_data, timeout=60)
-                response.raise_for_status()
-                return response.json()
-        except requests.exceptions.RequestException:
-            logger.exception("API 請求失敗")
-            return {}
-        except Exception:
-            logger.exception("發送 API 請求時發生未知錯誤")
-            return {}
+        return url, headers
 
     def get_model_list(self) -> dict[str, Any]:
         """取得模型列表"""
+        session = self._get_session()
         key = self._get_api_key()
         headers = {"Content-Type": "application/json"}
 
@@ -110,10 +225,9 @@ class GeminiAPIClient:
             try:
                 url = f"{self._ollama_proxy_url}/api/tags"
                 headers["Authorization"] = f"Bearer {key}"
-                with requests.Session() as session:
-                    response = session.get(url, headers=headers, timeout=60)
-                    response.raise_for_status()
-                    return {"ollama": response.json()}
+                response = session.get(url, headers=headers, timeout=60)
+                response.raise_for_status()
+                return {"ollama": orjson.loads(response.content)}
             except Exception:
                 logger.exception("取得 Ollama 模型列表失敗")
 
@@ -122,10 +236,9 @@ class GeminiAPIClient:
             try:
                 url = f"{self._proxy_url}/{self.DEFAULT_API_VERSION}/models"
                 headers["X-goog-api-key"] = key
-                with requests.Session() as session:
-                    response = session.get(url, headers=headers, timeout=60)
-                    response.raise_for_status()
-                    return {"gemini": response.json()}
+                response = session.get(url, headers=headers, timeout=60)
+                response.raise_for_status()
+                return {"gemini": orjson.loads(response.content)}
             except Exception:
                 logger.exception("取得 Gemini 模型列表失敗")
 
@@ -157,7 +270,7 @@ def configure_client(
     client = get_client()
     client.configure(pay_key, api_base_url, proxy_url, ollama_proxy_url)
     if api_keys:
-        client._api_keys = api_keys
+        client.set_api_keys(api_keys)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -165,6 +278,65 @@ def configure_client(
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
+# 每次讀取的原始位元組數，為 base64 編碼單位（3 bytes）的整數倍，分段編碼結果可直接串接
+_B64_CHUNK_SIZE = 57 * 4096
+
+
+# 每次讀取的 base64 字元數
+_B64_DECODE_CHUNK = 4 * 16384
+
+# base64 字母表以外的字元（換行等），與 b64decode 相同直接略過
+_B64_NON_ALPHABET = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+def _write_b64_file(b64_data: str, path: Path) -> None:
+    """分段解碼 base64 字串並寫入檔案，不需同時持有完整的解碼結果"""
+    # 移除非字母表字元後各段長度不一定是 4 的倍數，餘下的字元併入下一段再解碼
+    pending = ""
+    with path.open("wb") as f:
+        for start in range(0, len(b64_data), _B64_DECODE_CHUNK):
+            chunk = pending + _B64_NON_ALPHABET.sub("", b64_data[start : start + _B64_DECODE_CHUNK])
+            cut = len(chunk) - len(chunk) % 4
+            f.write(binascii.a2b_base64(chunk[:cut]))
+            pending = chunk[cut:]
+        if pending:
+            # 結尾不足 4 個字元表示 padding 錯誤，與 b64decode 一樣拋出 binascii.Error
+            f.write(binascii.a2b_base64(pending))
+
+
+def _guess_image_mime(path: Path) -> str | None:
+    """依副檔名取得圖片 MIME 類型；常見格式直接查表，其餘才交給 mimetypes"""
+    mime_type = IMG_MIME_TYPES.get(path.suffix.lower())
+    if mime_type is None:
+        mime_type, _ = mimetypes.guess_type(path)
+    return mime_type
+
+
+# MIME 類型 → 副檔名（反查 IMG_MIME_TYPES，同一類型以先列出的副檔名為準）
+_IMG_EXT_BY_MIME = {mime: ext for ext, mime in reversed(IMG_MIME_TYPES.items())}
+
+
+def _guess_image_extension(mime_type: str) -> str:
+    """依 MIME 類型取得圖片副檔名；常見格式直接查表，其餘才交給 mimetypes"""
+    return _IMG_EXT_BY_MIME.get(mime_type) or mimetypes.guess_extension(mime_type) or ".png"
+
+
+def _b64_file(path: Path) -> str:
+    """分段讀取檔案並以 base64 編碼，不需同時持有完整原始資料"""
+    encoded = bytearray()
+    with path.open("rb") as f:
+        while chunk := f.read(_B64_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    # base64 輸出必為 ASCII，走 ASCII 解碼的快速路徑
+    return encoded.decode("ascii")
+
+
+@lru_cache(maxsize=64)
+def _system_instruction_block(text: str) -> dict[str, Any]:
+    """產生 systemInstruction 區塊；相同的系統提示詞跨請求共用同一物件（唯讀，僅供序列化）"""
+    return {"role": "user", "parts": ({"text": text},)}
+
+
 def _generate_content_gemini(
     ai_config: AIConfig,
     chat_data: dict[str, Any] | None = None,
@@ -177,23 +349,17 @@ def _generate_content_gemini(
     if chat_data is None:
         chat_data = {
             "contents": [],
-            "safetySettings": [
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-            ],
-            "generationConfig": {},
+            # 安全設定為固定內容，直接共用 config 中的 tuple（僅供序列化）
+            "safetySettings": GEMINI_SAFETY_SETTINGS,
+            "generationConfig": {
+                "candidateCount": 1,
+                "maxOutputTokens": 65536,
+                "temperature": ai_config.temperature,
+                "topP": ai_config.top_p,
+                "topK": ai_config.top_k,
+            },
             "systemInstruction": {"parts": []},
         }
-        generation_config = {
-            "candidateCount": 1,
-            "maxOutputTokens": 65536,
-            "temperature": ai_config.temperature,
-            "topP": ai_config.top_p,
-            "topK": ai_config.top_k,
-        }
-        chat_data["generationConfig"] = generation_config
 
     parts: list[dict[str, Any]] = []
 
@@ -202,18 +368,17 @@ def _generate_content_gemini(
         for image_path_str in image_path_list:
             try:
                 image_path = Path(image_path_str)
-                if not image_path.is_file():
-                    logger.warning(f"圖片檔案不存在，已略過：{image_path}")
-                    continue
-
-                mime_type, _ = mimetypes.guess_type(image_path)
+                # 先以副檔名判斷類型（不觸及檔案系統），確認是圖片後才檢查檔案
+                mime_type = _guess_image_mime(image_path)
                 if not mime_type or not mime_type.startswith("image"):
                     logger.warning(f"無法識別的圖片 MIME 類型，已略過：{mime_type}")
                     continue
 
-                image_bytes = image_path.read_bytes()
-                encoded_image = base64.b64encode(image_bytes).decode("utf-8")
-                parts.append({"inlineData": {"mimeType": mime_type, "data": encoded_image}})
+                if not image_path.is_file():
+                    logger.warning(f"圖片檔案不存在，已略過：{image_path}")
+                    continue
+
+                parts.append({"inlineData": {"mimeType": mime_type, "data": _b64_file(image_path)}})
             except Exception:
                 logger.exception(f"處理圖片時發生錯誤：{image_path_str}")
 
@@ -225,8 +390,12 @@ def _generate_content_gemini(
         chat_data["contents"].append({"role": role, "parts": parts})
 
     if system_instruction:
-        chat_data["systemInstruction"]["parts"].append({"text": system_instruction})
-        chat_data["systemInstruction"]["role"] = "user"
+        existing_parts = chat_data["systemInstruction"]["parts"]
+        if existing_parts:
+            # 已有系統提示詞時維持附加行為；快取區塊為唯讀，另建新的區塊
+            chat_data["systemInstruction"] = {"role": "user", "parts": [*existing_parts, {"text": system_instruction}]}
+        else:
+            chat_data["systemInstruction"] = _system_instruction_block(system_instruction)
 
     return chat_data
 
@@ -254,17 +423,15 @@ def _generate_content_ollama(
             for image_path_str in image_path_list:
                 try:
                     image_path = Path(image_path_str)
-                    if not image_path.is_file():
-                        logger.warning(f"圖片檔案不存在，已略過：{image_path}")
+                    mime_type = _guess_image_mime(image_path)
+                    if not mime_type or not mime_type.startswith("image"):
                         continue
 
-                    mime_type, _ = mimetypes.guess_type(image_path)
-                    if not mime_type or not mime_type.startswith("image"):
+                    if not image_path.is_file():
+                        logger.warning(f"圖片檔案不存在，已略過：{image_path}")
                         continue
 
-                    image_bytes = image_path.read_bytes()
-                    encoded_image = base64.b64encode(image_bytes).decode("utf-8")
-                    images_base64.append(encoded_image)
+                    images_base64.append(_b64_file(image_path))
                 except Exception:
                     logger.exception(f"處理圖片時發生錯誤：{image_path_str}")
 
@@ -302,11 +469,11 @@ def _parse_content_gemini(response: dict[str, Any]) -> tuple[bool, str, str]:
     try:
         candidates = response.get("candidates", [])
         if not candidates:
-            return False, json.dumps(response, indent=2, ensure_ascii=False), ""
+            return False, _dumps_indented(response), ""
 
         parts = candidates[0].get("content", {}).get("parts", [])
         if not parts:
-            return False, json.dumps(response, indent=2, ensure_ascii=False), ""
+            return False, _dumps_indented(response), ""
 
         for part in parts:
             if "text" in part:
@@ -318,13 +485,11 @@ def _parse_content_gemini(response: dict[str, Any]) -> tuple[bool, str, str]:
 
                 if mime_type.startswith("image/") and b64_data:
                     try:
-                        image_bytes = base64.b64decode(b64_data)
                         output_dir = Path("output_images")
                         output_dir.mkdir(exist_ok=True)
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                        extension = mimetypes.guess_extension(mime_type) or ".png"
-                        save_path = output_dir / f"{timestamp}{extension}"
-                        save_path.write_bytes(image_bytes)
+                        save_path = output_dir / f"{timestamp}{_guess_image_extension(mime_type)}"
+                        _write_b64_file(b64_data, save_path)
                         image_output_path = str(save_path)
                         logger.info(f"AI 生成的圖片已儲存至：{image_output_path}")
                     except Exception:
@@ -345,11 +510,11 @@ def _parse_content_ollama(response: dict[str, Any]) -> tuple[bool, str, str]:
     try:
         message = response.get("message", {})
         if not message:
-            return False, json.dumps(response, indent=2, ensure_ascii=False), ""
+            return False, _dumps_indented(response), ""
 
         result_text = message.get("content", "")
         if not result_text:
-            return False, json.dumps(response, indent=2, ensure_ascii=False), ""
+            return False, _dumps_indented(response), ""
 
         return True, result_text, ""
 
@@ -367,6 +532,35 @@ def _parse_content_response(ai_config: AIConfig, response: dict[str, Any]) -> tu
     return False, f"錯誤的供應商: {ai_config.provider}", ""
 
 
+# 以對話方式注入系統提示詞的開場輪次：role 模式 -> ((角色, 文字), ...)，文字為 None 時代入系統提示詞
+# 未列出的 role 模式改用 systemInstruction
+_BOOTSTRAP_TURNS: dict[int, tuple[tuple[str, str | None], ...]] = {
+    0: (("user", None), ("model", "OK")),
+    1: (("user", "生成規則"), ("model", None)),
+}
+
+
+def _build_prompt_request(
+    ai_config: AIConfig,
+    system_text: str,
+    prompt_text: str,
+    image_path_list: list[str] | None,
+    role: int,
+) -> dict[str, Any]:
+    """組出 process_prompt / aprocess_prompt 共用的請求內容"""
+    chat_data = None
+
+    if system_text:
+        bootstrap_turns = _BOOTSTRAP_TURNS.get(role)
+        if bootstrap_turns is None:
+            chat_data = _generate_content_request(ai_config, system_instruction=system_text)
+        else:
+            for turn_role, turn_text in bootstrap_turns:
+                chat_data = _generate_content_request(ai_config, chat_data=chat_data, text=turn_text or system_text, role=turn_role)
+
+    return _generate_content_request(ai_config, chat_data=chat_data, text=prompt_text, role="user", image_path_list=image_path_list)
+
+
 def process_prompt(
     ai_config: AIConfig,
     system_text: str = "",
@@ -386,19 +580,7 @@ def process_prompt(
     Returns:
         (是否成功, 回應文字, 圖片路徑)
     """
-    chat_data = None
-
-    if system_text:
-        if role == 0:
-            chat_data = _generate_content_request(ai_config, text=system_text, role="user")
-            chat_data = _generate_content_request(ai_config, chat_data=chat_data, text="OK", role="model")
-        elif role == 1:
-            chat_data = _generate_content_request(ai_config, text="生成規則", role="user")
-            chat_data = _generate_content_request(ai_config, chat_data=chat_data, text=system_text, role="model")
-        else:
-            chat_data = _generate_content_request(ai_config, chat_data=chat_data, system_instruction=system_text)
-
-    chat_data = _generate_content_request(ai_config, chat_data=chat_data, text=prompt_text, role="user", image_path_list=image_path_list)
+    chat_data = _build_prompt_request(ai_config, system_text, prompt_text, image_path_list, role)
 
     # 發送請求
     client = get_client()
@@ -410,13 +592,36 @@ def process_prompt(
     return _parse_content_response(ai_config, response)
 
 
+async def aprocess_prompt(
+    ai_config: AIConfig,
+    system_text: str = "",
+    prompt_text: str = "",
+    image_path_list: list[str] | None = None,
+    role: int = 0,
+) -> tuple[bool, str, str]:
+    """process_prompt 的非同步版本，參數與回傳值相同。
+
+    圖片讀取編碼與生成圖片的寫檔移至執行緒，API 請求以共用的 httpx.AsyncClient 送出。
+    """
+    chat_data = await asyncio.to_thread(_build_prompt_request, ai_config, system_text, prompt_text, image_path_list, role)
+
+    # 發送請求
+    client = get_client()
+    response = await client.agenerate_content(ai_config, chat_data)
+
+    if not response:
+        return False, "API 請求未收到有效回應或回應為空", ""
+
+    return await asyncio.to_thread(_parse_content_response, ai_config, response)
+
+
 def requests_prompt(
     system_text: str = "",
     prompt_text: str = "",
     role: int = 0,
 ) -> list[dict[str, Any]]:
     """取得請求 payload（用於除錯或預覽）"""
-    ai_config = AIConfig({})
+    ai_config = AIConfig()
     chat_data = None
 
     if system_text:
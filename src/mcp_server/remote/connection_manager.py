@@ -6,15 +6,57 @@ WebSocket Server，等待遠端 Browser Agent 連接。
 """
 
 import asyncio
-import json
+import hmac
+import itertools
 import logging
-import uuid
+import struct
 from typing import Any, Optional
 
+import orjson
+
 from mcp_server.config import REMOTE_BROWSER_ENABLED, REMOTE_BROWSER_PORT, REMOTE_BROWSER_TOKEN
 
 logger = logging.getLogger(__name__)
 
+# Server 支援的協定功能（於認證成功時告知 Browser Agent）
+SERVER_CAPABILITIES = ["binary_frames", "batched_responses"]
+
+# 二進位 frame 格式：0x00 標記 + header 長度（4 bytes, big-endian）+ JSON header + 原始資料
+# 需與 clients/browser_agent/client.py 保持一致
+_BINARY_MARKER = b"\x00"
+_BINARY_HEADER = struct.Struct("!I")
+
+# 認證流程的固定回應，於模組載入時序列化一次
+_MSG_AUTH_REQUIRED = orjson.dumps({"type": "error", "message": "需要認證"})
+_MSG_AUTH_FAILED = orjson.dumps({"type": "auth_failed", "message": "Token 無效"})
+_MSG_AUTH_SUCCESS = orjson.dumps({"type": "auth_success", "capabilities": SERVER_CAPABILITIES})
+
+# 以 bytes 比對 Token（hmac.compare_digest 的 str 參數僅接受 ASCII）
+_REMOTE_BROWSER_TOKEN_BYTES = REMOTE_BROWSER_TOKEN.encode()
+
+
+def _is_valid_token(token: Any) -> bool:
+    """以固定時間比對 Browser Agent 提供的 Token，避免經由回應時間推測 Token 內容"""
+    return isinstance(token, str) and hmac.compare_digest(token.encode(), _REMOTE_BROWSER_TOKEN_BYTES)
+
+
+def _decode_binary_frame(message: bytes) -> dict[str, Any]:
+    """
+    解析二進位 frame
+
+    JSON header 即為一般回應，原始資料依 header 的 binary_key 放回 data 中；
+    header 含 binary_encoding 時（如分段串流的 HTML）則解碼為字串。
+    """
+    (header_len,) = _BINARY_HEADER.unpack_from(message, len(_BINARY_MARKER))
+    start = len(_BINARY_MARKER) + _BINARY_HEADER.size
+    data = orjson.loads(message[start : start + header_len])
+    payload: bytes | str = message[start + header_len :]
+    encoding = data.pop("binary_encoding", None)
+    if encoding:
+        payload = payload.decode(encoding)
+    data["data"][data.pop("binary_key")] = payload
+    return data
+
 
 class RemoteConnectionManager:
     """
@@ -39,7 +81,9 @@ class RemoteConnectionManager:
 
         self._server: Any = None
         self._websocket: Any = None
-        self._pending_requests: dict[str, asyncio.Future] = {}
+        self._pending_requests: dict[int, asyncio.Future] = {}
+        # 指令 request_id 以遞增整數產生（單一事件迴圈內使用，不需加鎖）
+        self._request_ids = itertools.count()
         self._is_running = False
         self._connection_info: dict[str, Any] = {}
 
@@ -48,6 +92,10 @@ class RemoteConnectionManager:
         """檢查是否有遠端連線"""
         return self._websocket is not None and self._websocket.open
 
+    def has_capability(self, name: str) -> bool:
+        """目前連線的 Browser Agent 是否支援指定的協定功能（於認證時告知）"""
+        return name in self._connection_info.get("capabilities", ())
+
     @property
     def connection_info(self) -> dict[str, Any]:
         """取得連線資訊"""
@@ -73,15 +121,15 @@ class RemoteConnectionManager:
                 # 驗證 Token
                 try:
                     auth_message = await asyncio.wait_for(websocket.recv(), timeout=10.0)
-                    auth_data = json.loads(auth_message)
+                    auth_data = orjson.loads(auth_message)
 
                     if auth_data.get("type") != "auth":
-                        await websocket.send(json.dumps({"type": "error", "message": "需要認證"}))
+                        await websocket.send(_MSG_AUTH_REQUIRED)
                         await websocket.close()
                         return
 
-                    if auth_data.get("token") != REMOTE_BROWSER_TOKEN:
-                        await websocket.send(json.dumps({"type": "auth_failed", "message": "Token 無效"}))
+                    if not _is_valid_token(auth_data.get("token")):
+                        await websocket.send(_MSG_AUTH_FAILED)
                         await websocket.close()
                         return
 
@@ -91,17 +139,18 @@ class RemoteConnectionManager:
                         "client_id": auth_data.get("client_id", "unknown"),
                         "user_agent": auth_data.get("user_agent", "unknown"),
                         "connected_at": auth_data.get("timestamp", ""),
+                        "capabilities": auth_data.get("capabilities", []),
                     }
 
-                    await websocket.send(json.dumps({"type": "auth_success"}))
-                    logger.info(f"✅ 遠端 Browser Agent 已連線: {self._connection_info}")
+                    await websocket.send(_MSG_AUTH_SUCCESS)
+                    logger.info("✅ 遠端 Browser Agent 已連線: %s", self._connection_info)
 
                 except asyncio.TimeoutError:
                     logger.warning("遠端連線認證逾時")
                     await websocket.close()
                     return
                 except Exception as e:
-                    logger.exception(f"遠端連線認證失敗: {e}")
+                    logger.exception("遠端連線認證失敗: %s", e)
                     await websocket.close()
                     return
 
@@ -110,7 +159,7 @@ class RemoteConnectionManager:
                     async for message in websocket:
                         await self._handle_message(message)
                 except Exception as e:
-                    logger.exception(f"WebSocket 訊息處理錯誤: {e}")
+                    logger.exception("WebSocket 訊息處理錯誤: %s", e)
                 finally:
                     logger.info("🔴 遠端 Browser Agent 已斷線")
                     self._websocket = None
@@ -122,14 +171,20 @@ class RemoteConnectionManager:
                 REMOTE_BROWSER_PORT,
                 ping_interval=30,
                 ping_timeout=10,
+                # 訊息多為小型 JSON 與已壓縮的 PNG，停用 permessage-deflate 以節省 CPU
+                compression=None,
+                # 整頁截圖與大型 HTML 可能超過預設的 1 MiB，需與 Browser Agent 設定一致
+                max_size=16 * 1024 * 1024,
+                max_queue=32,
+                write_limit=2**20,
             )
             self._is_running = True
-            logger.info(f"🚀 遠端瀏覽器 WebSocket Server 已啟動: ws://0.0.0.0:{REMOTE_BROWSER_PORT}")
+            logger.info("🚀 遠端瀏覽器 WebSocket Server 已啟動: ws://0.0.0.0:%d", REMOTE_BROWSER_PORT)
 
         except ImportError:
             logger.error("❌ 未安裝 websockets 套件，請執行: pip install websockets")
         except Exception as e:
-            logger.exception(f"❌ 啟動 WebSocket Server 失敗: {e}")
+            logger.exception("❌ 啟動 WebSocket Server 失敗: %s", e)
 
     async def stop_server(self) -> None:
         """停止 WebSocket Server"""
@@ -140,10 +195,29 @@ class RemoteConnectionManager:
             self._is_running = False
             logger.info("🛑 遠端瀏覽器 WebSocket Server 已停止")
 
-    async def _handle_message(self, message: str) -> None:
+    async def _handle_message(self, message: str | bytes) -> None:
         """處理來自遠端的訊息"""
         try:
-            data = json.loads(message)
+            if isinstance(message, bytes) and message.startswith(_BINARY_MARKER):
+                data = _decode_binary_frame(message)
+            else:
+                data = orjson.loads(message)
+        except (ValueError, TypeError, AttributeError, LookupError, struct.error):
+            # 格式錯誤的 frame 只略過該筆（JSON / binary_encoding 解碼失敗、header 非物件、data 非 dict、未知編碼等），
+            # 不中斷與 Browser Agent 的連線
+            preview = message[:100]
+            if isinstance(preview, bytes):
+                preview = preview.decode("utf-8", "replace")
+            logger.warning("無法解析訊息: %s", preview)
+            return
+
+        # Server 告知 batched_responses 後，Browser Agent 會將同時就緒的多筆回應合併為 JSON 陣列發送
+        for item in data if isinstance(data, list) else (data,):
+            self._dispatch_message(item)
+
+    def _dispatch_message(self, data: dict[str, Any]) -> None:
+        """分派單筆已解析的訊息"""
+        try:
             msg_type = data.get("type")
 
             if msg_type == "response":
@@ -153,19 +227,17 @@ class RemoteConnectionManager:
                     future = self._pending_requests.pop(request_id)
                     if not future.done():
                         future.set_result(data)
-                    logger.debug(f"收到回應: request_id={request_id}")
+                    logger.debug("收到回應: request_id=%s", request_id)
 
             elif msg_type == "event":
                 # 處理事件（如頁面變化）
-                logger.debug(f"收到事件: {data}")
+                logger.debug("收到事件: %s", data)
 
             else:
-                logger.warning(f"未知訊息類型: {msg_type}")
+                logger.warning("未知訊息類型: %s", msg_type)
 
-        except json.JSONDecodeError:
-            logger.warning(f"無法解析訊息: {message[:100]}")
         except Exception as e:
-            logger.exception(f"處理訊息錯誤: {e}")
+            logger.exception("處理訊息錯誤: %s", e)
 
     async def send_command(self, action: str, params: dict[str, Any], timeout: float = 30.0) -> dict[str, Any]:
         """
@@ -186,8 +258,8 @@ class RemoteConnectionManager:
         if not self.is_connected:
             raise RuntimeError("無遠端 Browser Agent 連線")
 
-        request_id = str(uuid.uuid4())
-        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        request_id = next(self._request_ids)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
         self._pending_requests[request_id] = future
 
         try:
@@ -198,8 +270,9 @@ class RemoteConnectionManager:
                 "params": params,
             }
 
-            await self._websocket.send(json.dumps(command))
-            logger.debug(f"發送指令: action={action}, request_id={request_id}")
+            # orjson 直接輸出 bytes，省去 str -> bytes 的編碼（Browser Agent 同時接受文字與二進位訊息）
+            await self._websocket.send(orjson.dumps(command))
+            logger.debug("發送指令: action=%s, request_id=%s", action, request_id)
 
             # 等待回應
             result = await asyncio.wait_for(future, timeout=timeout)
@@ -212,11 +285,11 @@ class RemoteConnectionManager:
 
         except asyncio.TimeoutError:
             self._pending_requests.pop(request_id, None)
-            logger.error(f"指令逾時: action={action}, request_id={request_id}")
+            logger.error("指令逾時: action=%s, request_id=%s", action, request_id)
             raise
         except Exception as e:
             self._pending_requests.pop(request_id, None)
-            logger.exception(f"發送指令失敗: {e}")
+            logger.exception("發送指令失敗: %s", e)
             raise
 
     async def get_remote_url(self) -> str:
@@ -234,6 +307,20 @@ class RemoteConnectionManager:
         result = await self.send_command("get_viewport", {})
         return result.get("viewport")
 
+    async def send_batch(self, ops: list[dict[str, Any]], timeout: float = 30.0) -> list[dict[str, Any]]:
+        """
+        以單一指令讓遠端並行執行多個互不相依的操作
+
+        Args:
+            ops: 操作列表，格式為 [{"method": "get_title", "args": {...}}, ...]
+            timeout: 逾時時間（秒）
+
+        Returns:
+            與 ops 順序一致的結果列表，每項包含 success 與 data 或 error
+        """
+        result = await self.send_command("batch", {"ops": ops}, timeout=timeout)
+        return result.get("results", [])
+
 
 # 全域管理器實例
 remote_connection_manager = RemoteConnectionManager()
@@ -7,6 +7,8 @@ Page Proxy - 遠端 Page 代理
 
 import base64
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
@@ -16,6 +18,13 @@ from mcp_server.remote.connection_manager import remote_connection_manager
 logger = logging.getLogger(__name__)
 
 
+def _screenshot_bytes(result: dict[str, Any]) -> bytes:
+    """取出截圖資料（二進位 frame 直接為 bytes，舊版 Browser Agent 為 base64）"""
+    if "bytes" in result:
+        return result["bytes"]
+    return base64.b64decode(result.get("base64", ""))
+
+
 class PageProxy:
     """
     遠端 Page 代理類別
@@ -54,6 +63,25 @@ class PageProxy:
         result = await remote_connection_manager.send_command("get_viewport", {})
         return result.get("viewport")
 
+    async def get_page_info(self) -> tuple[str, str, dict[str, int] | None]:
+        """
+        一次取得 URL、標題與 viewport
+
+        Browser Agent 支援 batch 時以單一指令並行取得，只需一次來回；舊版則逐一查詢。
+
+        Returns:
+            (URL, 標題, viewport 尺寸)
+        """
+        if not remote_connection_manager.has_capability("batch"):
+            return await self.get_url(), await self.title(), await self.get_viewport_size()
+
+        results = await remote_connection_manager.send_batch([{"method": "get_url"}, {"method": "get_title"}, {"method": "get_viewport"}])
+        for result in results:
+            if not result.get("success", False):
+                raise RuntimeError(f"遠端執行失敗: {result.get('error', '未知錯誤')}")
+        url, title, viewport = (result.get("data") for result in results)
+        return url or "", title or "", viewport
+
     # ═══════════════════════════════════════════════════════════════════════════════
     # 導航相關方法
     # ═══════════════════════════════════════════════════════════════════════════════
@@ -112,8 +140,7 @@ class PageProxy:
             timeout=60.0,  # 截圖可能較慢
         )
 
-        base64_data = result.get("base64", "")
-        screenshot_bytes = base64.b64decode(base64_data)
+        screenshot_bytes = _screenshot_bytes(result)
 
         # 如果指定路徑，儲存檔案
         if path:
@@ -177,6 +204,35 @@ class PageProxy:
             elements.append(ElementProxy(selector, index=i))
         return elements
 
+    @asynccontextmanager
+    async def snapshot_selector(self, selector: str) -> AsyncIterator[list["ElementProxy"]]:
+        """
+        查詢所有符合的元素，並讓 Browser Agent 在區塊內保留其 ElementHandle
+
+        區塊內的 inner_text / get_attribute 帶入快照 token，Browser Agent 不必每次重新查詢；
+        離開區塊時釋放快照。舊版 Browser Agent 不支援時等同 query_selector_all。
+
+        Args:
+            selector: CSS Selector
+
+        Yields:
+            ElementProxy 列表
+        """
+        if not remote_connection_manager.has_capability("element_snapshots"):
+            yield await self.query_selector_all(selector)
+            return
+
+        result = await remote_connection_manager.send_command("snapshot_selector", {"selector": selector})
+        token = result.get("token", "")
+        try:
+            yield [ElementProxy(selector, index=i, token=token) for i in range(result.get("count", 0))]
+        finally:
+            try:
+                await remote_connection_manager.send_command("release_snapshot", {"token": token})
+            except Exception as e:
+                # 連線中斷時 Browser Agent 端的快照會隨頁面回收，不影響呼叫端結果
+                logger.debug("釋放元素快照失敗: %s", e)
+
     # ═══════════════════════════════════════════════════════════════════════════════
     # 內容提取方法
     # ═══════════════════════════════════════════════════════════════════════════════
@@ -302,6 +358,12 @@ class PageProxy:
         Args:
             cookies: cookie 物件列表
         """
+        if remote_connection_manager.has_capability("add_cookies"):
+            # 單一指令一次送出所有 cookies，只需一次來回
+            await remote_connection_manager.send_command("add_cookies", {"cookies": cookies})
+            return
+
+        # 舊版 Browser Agent：逐一新增
         for cookie in cookies:
             await remote_connection_manager.send_command(
                 "add_cookie",
@@ -320,9 +382,11 @@ class ElementProxy:
     模擬 Playwright ElementHandle 物件。
     """
 
-    def __init__(self, selector: str, index: int = 0) -> None:
+    def __init__(self, selector: str, index: int = 0, token: str = "") -> None:
         self._selector = selector
         self._index = index
+        # snapshot_selector 的快照 token；有值時讀取操作直接使用 Browser Agent 保留的 ElementHandle
+        self._token = token
 
     async def click(self, click_count: int = 1, **kwargs: Any) -> None:
         """點擊元素"""
@@ -371,6 +435,7 @@ class ElementProxy:
             {
                 "selector": self._selector,
                 "index": self._index,
+                "token": self._token,
             },
         )
         return result.get("text", "")
@@ -383,6 +448,7 @@ class ElementProxy:
                 "selector": self._selector,
                 "index": self._index,
                 "name": name,
+                "token": self._token,
             },
         )
         return result.get("value")
@@ -398,8 +464,7 @@ class ElementProxy:
             timeout=60.0,
         )
 
-        base64_data = result.get("base64", "")
-        return base64.b64decode(base64_data)
+        return _screenshot_bytes(result)
 
     async def scroll_into_view_if_needed(self, **kwargs: Any) -> None:
         """滾動到元素可見"""
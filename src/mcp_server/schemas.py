@@ -1,12 +1,25 @@
 """
 資料模型定義
 
-包含 ExecutionResult、MCPError 等核心資料結構
+包含 ExecutionResult、MCPError、MCPRequest 等核心資料結構
 """
 
+import functools
 from dataclasses import dataclass, field
 from typing import Any
 
+import msgspec
+
+
+# 不顯示於文字輸出的 metadata 欄位
+_HIDDEN_METADATA_KEYS = frozenset({"version_info"})
+
+
+@functools.lru_cache(maxsize=256)
+def _metadata_label(key: str) -> str:
+    """metadata 欄位名稱轉為顯示標籤（欄位名稱種類有限，結果可快取）"""
+    return key.replace("_", " ").title()
+
 
 @dataclass
 class ExecutionResult:
@@ -25,8 +38,8 @@ class ExecutionResult:
         """轉換為人類可讀的文字格式"""
         lines: list[str] = []
         for key, value in self.metadata.items():
-            if value and key not in ["version_info"]:
-                lines.append(f"📁 {key.replace('_', ' ').title()}: {value}")
+            if value and key not in _HIDDEN_METADATA_KEYS:
+                lines.append(f"📁 {_metadata_label(key)}: {value}")
         lines.append(f"⏱️ Execution Time: {self.execution_time}")
         lines.append(f"🔢 Return Code: {self.returncode}")
         if not self.success:
@@ -46,3 +59,12 @@ class MCPError(Exception):
         self.message = message
         self.data = data
         super().__init__(message)
+
+
+class MCPRequest(msgspec.Struct):
+    """MCP JSON-RPC 請求（以 msgspec 直接解碼並驗證型別）"""
+
+    jsonrpc: str = "2.0"
+    id: int | str | None = None
+    method: str = ""
+    params: dict[str, Any] = {}
@@ -5,7 +5,10 @@
 """
 
 import fnmatch
+import functools
 import logging
+import os
+import re
 from typing import Any
 
 from fastapi import HTTPException, Request, status
@@ -17,12 +20,29 @@ logger = logging.getLogger(__name__)
 # 用於儲存 request state 的 key
 STATE_ALLOWED_TOOLS = "allowed_tools"
 STATE_EXCLUDED_TOOLS = "excluded_tools"
+STATE_PERMISSION_KEY = "permission_key"
 
+# 權限鍵：(允許清單, 排除清單)，可作為快取鍵使用
+PermissionKey = tuple[tuple[str, ...], tuple[str, ...]]
+_DEFAULT_PERMISSION_KEY: PermissionKey = (("*",), ())
 
-async def verify_api_key(request: Request) -> list[str]:
+# 各 API Key 的權限：token -> (允許清單, 排除清單, 權限鍵)，載入時建立一次
+_KEY_PERMISSIONS: dict[str, tuple[list[str], list[str], PermissionKey]] = {
+    token: (
+        key_config.get("tools", []),
+        key_config.get("exclude_tools", []),
+        (tuple(key_config.get("tools", [])), tuple(key_config.get("exclude_tools", []))),
+    )
+    for token, key_config in API_KEYS.items()
+}
+
+
+def verify_api_key(request: Request) -> list[str]:
     """
     驗證 API Key 並回傳允許的 Tools 清單
 
+    驗證過程不涉及 I/O，以同步函式實作，呼叫端不需 await。
+
     Args:
         request: FastAPI Request 物件
 
@@ -35,12 +55,13 @@ async def verify_api_key(request: Request) -> list[str]:
     # 若無設定任何 API Key，則跳過認證（開發模式）
     if not API_KEYS:
         request.state.allowed_tools = ["*"]
+        request.state.permission_key = _DEFAULT_PERMISSION_KEY
         return ["*"]
 
     auth_header = request.headers.get("Authorization")
     if not auth_header:
         client_host = request.client.host if request.client else "unknown"
-        logger.warning(f"Authorization Header 缺失: {client_host}")
+        logger.warning("Authorization Header 缺失: %s", client_host)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing Authorization Header. Expected format: 'Authorization: Bearer <token>'",
@@ -50,7 +71,7 @@ async def verify_api_key(request: Request) -> list[str]:
     parts = auth_header.split()
     if len(parts) != 2 or parts[0].lower() != "bearer":
         client_host = request.client.host if request.client else "unknown"
-        logger.warning(f"無效的 Authorization 格式: {client_host}, Header: {auth_header[:20]}...")
+        logger.warning("無效的 Authorization 格式: %s, Header: %.20s...", client_host, auth_header)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Authorization format. Expected 'Bearer <token>'",
@@ -60,19 +81,20 @@ async def verify_api_key(request: Request) -> list[str]:
     token = parts[1]
 
     # 檢查 token 是否存在於 API_KEYS 中
-    if token not in API_KEYS:
+    permissions = _KEY_PERMISSIONS.get(token)
+    if permissions is None:
         client_host = request.client.host if request.client else "unknown"
-        logger.warning(f"無效的 API Key 嘗試: {client_host}")
+        logger.warning("無效的 API Key 嘗試: %s", client_host)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API Key",
         )
 
     # 取得該 API Key 允許的 tools 和排除的 tools
-    allowed_tools: list[str] = API_KEYS[token].get("tools", [])
-    excluded_tools: list[str] = API_KEYS[token].get("exclude_tools", [])
+    allowed_tools, excluded_tools, permission_key = permissions
     request.state.allowed_tools = allowed_tools
     request.state.excluded_tools = excluded_tools
+    request.state.permission_key = permission_key
     request.state.api_key = token  # 儲存 API Key 供後續使用
 
     # logger.debug(f"API Key 驗證成功，允許 tools: {allowed_tools}, 排除 tools: {excluded_tools}")
@@ -105,6 +127,49 @@ def get_excluded_tools(request: Request) -> list[str]:
     return getattr(request.state, STATE_EXCLUDED_TOOLS, [])
 
 
+def get_permission_key(request: Request) -> PermissionKey:
+    """
+    從 request state 取得權限鍵
+
+    Args:
+        request: FastAPI Request 物件
+
+    Returns:
+        PermissionKey: (允許清單, 排除清單)
+    """
+    return getattr(request.state, STATE_PERMISSION_KEY, _DEFAULT_PERMISSION_KEY)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_patterns(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    """將一組 wildcard 模式合併編譯為單一正規表示式（與 fnmatch.fnmatch 相同，比對前先 normcase）"""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns))
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_permitted(permission_key: PermissionKey, tool_name: str) -> bool:
+    """依權限鍵判斷 tool 是否允許執行（API Key 設定固定，結果可快取）"""
+    if not isinstance(tool_name, str):
+        return False
+    allowed_tools, excluded_tools = permission_key
+    name = os.path.normcase(tool_name)
+
+    # 先檢查是否在排除清單中（排除優先於允許）
+    excluded_re = _compile_patterns(excluded_tools)
+    if excluded_re is not None and excluded_re.match(name):
+        return False
+
+    # ["*"] 表示所有 tools 都允許
+    if "*" in allowed_tools:
+        return True
+
+    # 支援 wildcard 模式匹配，例如 "web_*" 會匹配 "web_search", "web_fetch" 等
+    allowed_re = _compile_patterns(allowed_tools)
+    return allowed_re is not None and allowed_re.match(name) is not None
+
+
 def is_tool_allowed(request: Request, tool_name: str) -> bool:
     """
     檢查指定的 tool 是否被允許執行
@@ -126,20 +191,7 @@ def is_tool_allowed(request: Request, tool_name: str) -> bool:
     Returns:
         bool: 是否允許執行
     """
-    excluded_tools = get_excluded_tools(request)
-
-    # 先檢查是否在排除清單中（排除優先於允許）
-    if excluded_tools and any(fnmatch.fnmatch(tool_name, pattern) for pattern in excluded_tools):
-        return False
-
-    allowed_tools = get_allowed_tools(request)
-
-    # ["*"] 表示所有 tools 都允許
-    if "*" in allowed_tools:
-        return True
-
-    # 支援 wildcard 模式匹配，例如 "web_*" 會匹配 "web_search", "web_fetch" 等
-    return any(fnmatch.fnmatch(tool_name, pattern) for pattern in allowed_tools)
+    return _is_permitted(get_permission_key(request), tool_name)
 
 
 def filter_allowed_tools(request: Request, all_tools: list[dict]) -> list[dict]:
@@ -159,21 +211,8 @@ def filter_allowed_tools(request: Request, all_tools: list[dict]) -> list[dict]:
     Returns:
         list[dict]: 過濾後的 tools 清單
     """
-    allowed_tools = get_allowed_tools(request)
-    excluded_tools = get_excluded_tools(request)
-
-    def is_excluded(tool_name: str) -> bool:
-        """檢查 tool 是否在排除清單中"""
-        return any(fnmatch.fnmatch(tool_name, pattern) for pattern in excluded_tools)
-
-    def is_allowed(tool_name: str) -> bool:
-        """檢查 tool 是否在允許清單中"""
-        if "*" in allowed_tools:
-            return True
-        return any(fnmatch.fnmatch(tool_name, pattern) for pattern in allowed_tools)
-
-    # 先過濾允許的 tools，再排除指定的 tools
-    return [tool for tool in all_tools if is_allowed(tool.get("name", "")) and not is_excluded(tool.get("name", ""))]
+    permission_key = get_permission_key(request)
+    return [tool for tool in all_tools if _is_permitted(permission_key, tool.get("name", ""))]
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
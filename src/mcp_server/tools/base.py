@@ -11,7 +11,7 @@ from typing import Any, ClassVar
 
 from fastapi import Request
 
-from mcp_server.schemas import ExecutionResult
+from mcp_server.schemas import ExecutionResult, MCPError
 
 ToolHandler = Callable[..., Awaitable[ExecutionResult]]
 
@@ -37,11 +37,13 @@ class ToolRegistry:
 
     # 明確宣告實例屬性，解決 Pylance 的靜態分析警告
     _tools: dict[str, ToolDefinition]
+    _version: int
 
     def __new__(cls) -> "ToolRegistry":
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._tools = {}
+            cls._instance._version = 0
         return cls._instance
 
     def register(self, name: str, description: str, input_schema: dict[str, Any]) -> Callable[[ToolHandler], ToolHandler]:
@@ -60,10 +62,16 @@ class ToolRegistry:
 
         def decorator(handler: ToolHandler) -> ToolHandler:
             self._tools[name] = ToolDefinition(name=name, description=description, input_schema=input_schema, handler=handler)
+            self._version += 1
             return handler
 
         return decorator
 
+    @property
+    def version(self) -> int:
+        """註冊表版本，每次註冊 Tool 時遞增（供快取判斷是否失效）"""
+        return self._version
+
     def list_tools(self) -> list[dict[str, Any]]:
         """列出所有 Tool 的 schema"""
         return [{"name": t.name, "description": t.description, "inputSchema": t.input_schema} for t in self._tools.values()]
@@ -83,8 +91,6 @@ class ToolRegistry:
         Raises:
             MCPError: Tool 不存在
         """
-        from mcp_server.schemas import MCPError
-
         tool = self._tools.get(name)
         if not tool:
             raise MCPError(-32601, f"Tool not found: {name}")
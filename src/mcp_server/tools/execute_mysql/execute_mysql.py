@@ -13,6 +13,7 @@ import aiomysql
 
 from mcp_server.config import (
     DANGEROUS_SQL_PATTERNS,
+    DANGEROUS_SQL_RE,
     MYSQL_DATABASE,
     MYSQL_HOST,
     MYSQL_MAX_ROWS,
@@ -73,6 +74,10 @@ async def handle_execute_mysql(args: dict[str, Any]) -> ExecutionResult:
     return await execute_mysql_query(sql, database, timeout)
 
 
+# 比對到的文字（轉大寫）-> 原始模式，用於回報
+_DANGEROUS_SQL_BY_UPPER = {pattern.upper(): pattern for pattern in DANGEROUS_SQL_PATTERNS}
+
+
 def _check_dangerous_sql(sql: str) -> str | None:
     """
     檢查 SQL 是否包含危險模式。
@@ -83,14 +88,11 @@ def _check_dangerous_sql(sql: str) -> str | None:
     Returns:
         如果發現危險模式，返回該模式；否則返回 None
     """
-    sql_upper = sql.upper()
-
-    for pattern in DANGEROUS_SQL_PATTERNS:
-        pattern_upper = pattern.upper()
-        if pattern_upper in sql_upper:
-            return pattern
-
-    return None
+    match = DANGEROUS_SQL_RE.search(sql)
+    if match is None:
+        return None
+    matched = match.group()
+    return _DANGEROUS_SQL_BY_UPPER.get(matched.upper(), matched)
 
 
 def _format_value(value: Any) -> str:
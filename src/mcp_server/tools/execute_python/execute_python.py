@@ -14,7 +14,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from mcp_server.config import MAX_EXECUTION_TIME, MAX_INPUT_LENGTH, MAX_OUTPUT_LENGTH, WORK_DIR
+from mcp_server.config import MAX_EXECUTION_TIME, MAX_INPUT_LENGTH, MAX_OUTPUT_LENGTH, WORK_DIR, ensure_work_dir
 from mcp_server.schemas import ExecutionResult
 from mcp_server.tools.base import registry
 
@@ -74,7 +74,7 @@ async def execute_python_file(code: str, timeout: int = MAX_EXECUTION_TIME) -> E
             raise ValueError(f"Code exceeds maximum length of {MAX_INPUT_LENGTH} characters")
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-        temp_file = WORK_DIR / f"exec_{timestamp}.py"
+        temp_file = ensure_work_dir() / f"exec_{timestamp}.py"
         temp_file.write_text(code, encoding="utf-8")
         logger.debug(f"Python 代碼已寫入: {temp_file}")
 
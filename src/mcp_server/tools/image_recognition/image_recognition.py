@@ -1,5 +1,6 @@
 """圖片辨識 Tool - 使用 AI 模型進行圖片內容分析"""
 
+import asyncio
 import logging
 import time
 from pathlib import Path
@@ -9,8 +10,8 @@ from urllib.parse import urlparse
 import requests
 
 from mcp_server.base.data_structures import AIConfig
-from mcp_server.config import WORK_DIR
-from mcp_server.model.gemini_api_client import process_prompt
+from mcp_server.config import ensure_work_dir
+from mcp_server.model.gemini_api_client import aprocess_prompt
 from mcp_server.schemas import ExecutionResult
 from mcp_server.tools.base import registry
 
@@ -174,7 +175,7 @@ def _download_image(url: str, work_dir: Path, timeout: int = DEFAULT_DOWNLOAD_TI
         return False, "", f"下載時發生錯誤: {e}"
 
 
-def _recognize_image(image_path: str, prompt: str, system_instruction: str, ai_config: AIConfig) -> tuple[bool, str, str]:
+async def _recognize_image(image_path: str, prompt: str, system_instruction: str, ai_config: AIConfig) -> tuple[bool, str, str]:
     """
     呼叫 AI 進行圖片辨識。
 
@@ -190,8 +191,8 @@ def _recognize_image(image_path: str, prompt: str, system_instruction: str, ai_c
     try:
         logger.info(f"開始 AI 辨識: provider={ai_config.provider}, model={ai_config.model_name}")
 
-        # 呼叫 natekit 的 process_prompt
-        success, result_text, output_image_path = process_prompt(ai_config=ai_config, system_text=system_instruction, prompt_text=prompt, image_path_list=[image_path], role=0)
+        # 呼叫 natekit 的 process_prompt（非同步版本，等待 AI 回應時不阻塞事件迴圈）
+        success, result_text, output_image_path = await aprocess_prompt(ai_config=ai_config, system_text=system_instruction, prompt_text=prompt, image_path_list=[image_path], role=0)
 
         if not success:
             return False, "", f"AI 辨識失敗: {result_text}"
@@ -254,19 +255,14 @@ async def handle_image_recognition(args: dict[str, Any]) -> ExecutionResult:
         return ExecutionResult(success=False, error_type="ValidationError", error_message="缺少必要參數: prompt")
 
     # 建立 AI 配置
-    ai_config = AIConfig(
-        {
-            "provider": provider,
-            "model_name": model_name,
-        }
-    )
+    ai_config = AIConfig(provider=provider, model_name=model_name)
 
     downloaded_file = None
 
     try:
         # 步驟 1: 下載圖片
         logger.info(f"開始處理圖片辨識請求: {image_url}")
-        download_success, local_path, download_error = _download_image(image_url, WORK_DIR, download_timeout)
+        download_success, local_path, download_error = await asyncio.to_thread(_download_image, image_url, ensure_work_dir(), download_timeout)
 
         if not download_success:
             return ExecutionResult(success=False, error_type="DownloadError", error_message=download_error, metadata={"image_url": image_url})
@@ -274,7 +270,7 @@ async def handle_image_recognition(args: dict[str, Any]) -> ExecutionResult:
         downloaded_file = local_path
 
         # 步驟 2: AI 辨識
-        recognition_success, result, recognition_error = _recognize_image(local_path, prompt, system_instruction, ai_config)
+        recognition_success, result, recognition_error = await _recognize_image(local_path, prompt, system_instruction, ai_config)
 
         if not recognition_success:
             return ExecutionResult(
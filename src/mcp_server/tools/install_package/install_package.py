@@ -10,7 +10,7 @@ import sys
 import traceback
 from typing import Any
 
-from mcp_server.config import DANGEROUS_PACKAGE_CHARS, MAX_EXECUTION_TIME, MAX_OUTPUT_LENGTH
+from mcp_server.config import DANGEROUS_PACKAGE_CHAR_SET, MAX_EXECUTION_TIME, MAX_OUTPUT_LENGTH
 from mcp_server.schemas import ExecutionResult
 from mcp_server.tools.base import registry
 
@@ -64,7 +64,7 @@ async def install_package(package_spec: str, timeout: int = MAX_EXECUTION_TIME)
     logger.info(f"開始安裝套件: {package_spec}")
 
     # 安全性檢查
-    if any(char in package_spec for char in DANGEROUS_PACKAGE_CHARS):
+    if not DANGEROUS_PACKAGE_CHAR_SET.isdisjoint(package_spec):
         return ExecutionResult(
             success=False, error_type="ValueError", error_message="Package specification contains invalid characters", stderr="Invalid characters in package name"
         )
@@ -12,10 +12,13 @@ Web Playwright Tool
 import asyncio
 import base64
 import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any, Optional, cast
 
-from playwright.async_api import Page
+from playwright.async_api import Page, async_playwright
 
 from mcp_server.config import (
     PLAYWRIGHT_CDP_ENDPOINT,
@@ -23,6 +26,8 @@ from mcp_server.config import (
     REMOTE_BROWSER_ENABLED,
     WORK_DIR,
 )
+from mcp_server.remote.connection_manager import remote_connection_manager
+from mcp_server.remote.page_proxy import PageProxy
 from mcp_server.schemas import ExecutionResult
 from mcp_server.tools.base import registry
 
@@ -34,8 +39,8 @@ logger = logging.getLogger(__name__)
 CDP_ENDPOINT = PLAYWRIGHT_CDP_ENDPOINT
 CDP_FALLBACK_ENDPOINT = "http://127.0.0.1:9222"  # 備用 CDP Endpoint
 DEFAULT_TIMEOUT = PLAYWRIGHT_DEFAULT_TIMEOUT
+# 目錄於實際寫入截圖時才建立（啟動時的 cleanup_work_directory 會清除工作目錄內容）
 SCREENSHOT_DIR = WORK_DIR / "screenshots"
-SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -72,26 +77,15 @@ class BrowserManager:
         """
         async with self._lock:
             # 檢查遠端連線
-            if REMOTE_BROWSER_ENABLED:
-                try:
-                    from mcp_server.remote.connection_manager import remote_connection_manager
-
-                    if remote_connection_manager.is_connected:
-                        # 延遲導入 PageProxy
-                        from mcp_server.remote.page_proxy import PageProxy
-
-                        self._remote_page_proxy = PageProxy()
-                        logger.info("✅ 使用遠端瀏覽器連線")
-                        return
-                except ImportError as e:
-                    logger.warning(f"無法導入遠端連線模組: {e}")
+            if REMOTE_BROWSER_ENABLED and remote_connection_manager.is_connected:
+                self._remote_page_proxy = PageProxy()
+                logger.info("✅ 使用遠端瀏覽器連線")
+                return
 
             # 檢查目前連線
             if self._browser is not None and self._browser.is_connected():
                 return
 
-            from playwright.async_api import async_playwright
-
             self._playwright = await async_playwright().start()
 
             # 優先嘗試 CDP 連線 (如果定義了 PLAYWRIGHT_CDP_ENDPOINT)
@@ -112,8 +106,6 @@ class BrowserManager:
             # 如果 CDP 連線失敗或未定義，則啟動容器內建瀏覽器 (Fallback)
             if self._browser is None:
                 try:
-                    import os
-
                     headless = os.getenv("PLAYWRIGHT_HEADLESS", "true").lower() == "true"
                     logger.info(f"正在啟動容器內建 Chromium 瀏覽器 (headless={headless})...")
                     self._browser = await self._playwright.chromium.launch(
@@ -179,16 +171,11 @@ class BrowserManager:
     def connection_info(self) -> dict[str, Any]:
         """取得連線資訊"""
         if self._remote_page_proxy is not None:
-            try:
-                from mcp_server.remote.connection_manager import remote_connection_manager
-
-                return {
-                    "mode": "remote",
-                    "connected": remote_connection_manager.is_connected,
-                    **remote_connection_manager.connection_info,
-                }
-            except ImportError:
-                return {"mode": "remote", "connected": False}
+            return {
+                "mode": "remote",
+                "connected": remote_connection_manager.is_connected,
+                **remote_connection_manager.connection_info,
+            }
 
         return {
             "mode": "local",
@@ -305,7 +292,7 @@ async def handle_web_screenshot(args: dict[str, Any]) -> ExecutionResult:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
             filename = f"screenshot_{timestamp}.png"
             filepath = SCREENSHOT_DIR / filename
-            # 確保目錄存在
+            # 確保目錄存在（含工作目錄本身）
             filepath.parent.mkdir(parents=True, exist_ok=True)
             filepath.write_bytes(screenshot_bytes)
             metadata["file_path"] = str(filepath.resolve())
@@ -330,6 +317,16 @@ async def handle_web_screenshot(args: dict[str, Any]) -> ExecutionResult:
         return ExecutionResult(success=False, error_type=type(e).__name__, error_message=str(e))
 
 
+@asynccontextmanager
+async def _query_all(page: Any, selector: str) -> AsyncIterator[list[Any]]:
+    """查詢所有符合的元素；遠端模式以快照保留 ElementHandle，逐一讀取時 Browser Agent 不必每次重新查詢"""
+    if isinstance(page, PageProxy):
+        async with page.snapshot_selector(selector) as elements:
+            yield elements
+    else:
+        yield await page.query_selector_all(selector)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Tool: web_extract
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -381,42 +378,41 @@ async def handle_web_extract(args: dict[str, Any]) -> ExecutionResult:
             if not selector:
                 return ExecutionResult(success=False, error_type="ValueError", error_message="extract_type=elements 時必須提供 selector")
 
-            elements = await page.query_selector_all(selector)
             results: list[dict[str, Any]] = []
-
-            for i, elem in enumerate(elements[:50]):  # 最多 50 個元素
-                text = await elem.inner_text()
-                elem_data = {"index": i, "text": text[:500]}
-                if attribute:
-                    attr_value = await elem.get_attribute(attribute)
-                    elem_data[attribute] = attr_value
-                results.append(elem_data)
+            async with _query_all(page, selector) as elements:
+                for i, elem in enumerate(elements[:50]):  # 最多 50 個元素
+                    text = await elem.inner_text()
+                    elem_data = {"index": i, "text": text[:500]}
+                    if attribute:
+                        attr_value = await elem.get_attribute(attribute)
+                        elem_data[attribute] = attr_value
+                    results.append(elem_data)
 
             result_data = results
             stdout_parts.append(f"📦 找到 {len(elements)} 個元素，回傳前 {len(results)} 個")
 
         elif extract_type == "links":
             # 提取所有連結
-            links = await page.query_selector_all("a[href]")
             results = []
-            for link in links[:100]:  # 最多 100 個連結
-                href = await link.get_attribute("href")
-                text = await link.inner_text()
-                if href:
-                    results.append({"href": href, "text": text.strip()[:200]})
+            async with _query_all(page, "a[href]") as links:
+                for link in links[:100]:  # 最多 100 個連結
+                    href = await link.get_attribute("href")
+                    text = await link.inner_text()
+                    if href:
+                        results.append({"href": href, "text": text.strip()[:200]})
 
             result_data = results
             stdout_parts.append(f"🔗 找到 {len(links)} 個連結，回傳前 {len(results)} 個")
 
         elif extract_type == "images":
             # 提取所有圖片
-            images = await page.query_selector_all("img[src]")
             results = []
-            for img in images[:100]:  # 最多 100 張圖片
-                src = await img.get_attribute("src")
-                alt = await img.get_attribute("alt") or ""
-                if src:
-                    results.append({"src": src, "alt": alt[:200]})
+            async with _query_all(page, "img[src]") as images:
+                for img in images[:100]:  # 最多 100 張圖片
+                    src = await img.get_attribute("src")
+                    alt = await img.get_attribute("alt") or ""
+                    if src:
+                        results.append({"src": src, "alt": alt[:200]})
 
             result_data = results
             stdout_parts.append(f"🖼️ 找到 {len(images)} 張圖片，回傳前 {len(results)} 張")
@@ -804,9 +800,7 @@ async def handle_web_get_status(args: dict[str, Any]) -> ExecutionResult:
 
         # 支援遠端模式
         if is_remote:
-            url = await cast(Any, page).get_url()
-            title = await page.title()
-            viewport = await cast(Any, page).get_viewport_size()
+            url, title, viewport = await cast(Any, page).get_page_info()
         else:
             url = page.url
             title = await page.title()
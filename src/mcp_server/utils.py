@@ -7,10 +7,30 @@
 import logging
 from typing import Any
 
+import orjson
+
 from mcp_server.schemas import ExecutionResult
 
 logger = logging.getLogger(__name__)
 
+# tools/call 結果的固定片段：{"content":[{"type":"text","text":...}],"isError":...,"metadata":...}
+_TOOL_RESULT_PREFIX = b'{"content":[{"type":"text","text":'
+_TOOL_RESULT_OK = b'}],"isError":false'
+_TOOL_RESULT_ERROR = b'}],"isError":true'
+_TOOL_RESULT_METADATA = b',"metadata":'
+_TOOL_RESULT_SUFFIX = b"}"
+
+
+def _log_tool_result(result: ExecutionResult, text_output: str) -> None:
+    """記錄回覆長度"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "📊 MCP 回覆格式化完成 | 文本長度: %s 字符 | 成功: %s | Tool: %s",
+            f"{len(text_output):,}",
+            result.success,
+            result.metadata.get("command", result.metadata.get("file_path", "unknown")),
+        )
+
 
 def format_tool_result(result: ExecutionResult) -> dict[str, Any]:
     """
@@ -27,17 +47,33 @@ def format_tool_result(result: ExecutionResult) -> dict[str, Any]:
     if result.metadata:
         response["metadata"] = result.metadata
 
-    # 記錄回覆長度
-    logger.info(
-        f"📊 MCP 回覆格式化完成 | "
-        f"文本長度: {len(text_output):,} 字符 | "
-        f"成功: {result.success} | "
-        f"Tool: {result.metadata.get('command', result.metadata.get('file_path', 'unknown'))}"
-    )
-
+    _log_tool_result(result, text_output)
     return response
 
 
+def encode_tool_result(result: ExecutionResult) -> bytes:
+    """
+    將 ExecutionResult 直接編碼為 MCP 回應的 JSON bytes
+
+    輸出與 orjson 序列化 format_tool_result() 的結果相同，
+    但僅序列化文字與 metadata，不建立中間的回應字典。
+
+    Args:
+        result: 執行結果
+
+    Returns:
+        MCP 格式的 JSON bytes
+    """
+    text_output = result.to_text_output()
+    parts = [_TOOL_RESULT_PREFIX, orjson.dumps(text_output), _TOOL_RESULT_OK if result.success else _TOOL_RESULT_ERROR]
+    if result.metadata:
+        parts += (_TOOL_RESULT_METADATA, orjson.dumps(result.metadata, default=str, option=orjson.OPT_NON_STR_KEYS))
+    parts.append(_TOOL_RESULT_SUFFIX)
+
+    _log_tool_result(result, text_output)
+    return b"".join(parts)
+
+
 def truncate_string(text: str, max_length: int = 100, suffix: str = "...") -> str:
     """截斷過長的字串"""
     if len(text) > max_length: